@@ -4,7 +4,7 @@ rwkit
 
 from importlib.metadata import PackageNotFoundError, version
 
-from .io_json import read_json, read_jsonl, write_json, write_jsonl
+from .io_json import read_json, read_jsonl, read_jsonl_many, write_json, write_jsonl
 from .io_text import read_lines, read_text, write_lines, write_text
 from .io_yaml import read_yaml, write_yaml
 
@@ -22,6 +22,7 @@ __all__ = [
     "read_json",
     "write_json",
     "read_jsonl",
+    "read_jsonl_many",
     "write_jsonl",
     "read_yaml",
     "write_yaml",
@@ -3,32 +3,473 @@ Common functions
 """
 
 import bz2
+import functools
 import gzip
+import io
 import lzma
+import mmap
+import os
+import queue
+import stat
 import tarfile
+import threading
 import zipfile
 from contextlib import contextmanager
 from pathlib import Path
-from typing import IO, Any, Dict, Iterator, Optional, Tuple, Union
+from types import ModuleType
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    AnyStr,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
+# Faster drop-in replacements for gzip, used if installed
 try:
-    import zstandard
+    from zlib_ng import gzip_ng as _gzip_ng
+    from zlib_ng import gzip_ng_threaded as _gzip_ng_threaded
+except ImportError:
+    _gzip_ng = gzip
+    _gzip_ng_threaded = None
 
-    _HAVE_ZSTD = True
+try:
+    from isal import igzip as _igzip
 except ImportError:
-    _HAVE_ZSTD = False
+    _igzip = _gzip_ng
+
+if TYPE_CHECKING:
+    import zstandard
+
+# Optional dependencies, imported on first use
+_zstandard: Optional[ModuleType] = None
+_lz4_frame: Optional[ModuleType] = None
 
 SUPPORTED_COMPRESSION_TYPES = (
     "bz2",
     "gzip",
+    "lz4",
     "tar",
     "xz",
     "zip",
     "zstd",
 )
 
+# Valid values of argument `compression`
+_VALID_COMPRESSION_TYPES = (None, "infer") + SUPPORTED_COMPRESSION_TYPES
+
+# Buffer size used for streams of (de)compressors
+_BUFFER_SIZE = 1 << 20
+
+# Minimum size of uncompressed files to memory-map in `map_file()`
+_MMAP_THRESHOLD = 1 << 20
+
+# Maximum number of file contents kept by `read_cached()`
+_CACHE_SIZE = 256
+
+# Maps file extensions to (compression, tar mode suffix)
+_INFER_TABLE: Dict[str, Tuple[Optional[str], Optional[str]]] = {
+    ".tar": ("tar", None),
+    ".tar.bz2": ("tar", ":bz2"),
+    ".tar.gz": ("tar", ":gz"),
+    ".tgz": ("tar", ":gz"),
+    ".tar.xz": ("tar", ":xz"),
+    ".bz2": ("bz2", None),
+    ".gz": ("gzip", None),
+    ".lz4": ("lz4", None),
+    ".xz": ("xz", None),
+    ".zip": ("zip", None),
+    ".zst": ("zstd", None),
+}
+
+# Default compression levels for writing. Higher levels cost much more time for small
+# gains in compression ratio. Levels of bz2 barely affect its speed.
+_DEFAULT_LEVELS: Dict[str, int] = {"bz2": 9, "gzip": 6, "xz": 3, "zstd": 3}
+
 ContainerType = Optional[Union[object, "zstandard.ZstdCompressor"]]
 
+T = TypeVar("T")
+
+
+def _import_zstandard() -> ModuleType:
+    """
+    Import module 'zstandard' on first use.
+
+    Raises:
+        ModuleNotFoundError: If package 'zstandard' is not installed.
+
+    Returns:
+        ModuleType: Module 'zstandard'.
+    """
+    global _zstandard
+
+    if _zstandard is None:
+        try:
+            import zstandard as _zstandard
+        except ImportError:
+            raise ModuleNotFoundError(
+                "No module named 'zstandard'. Install with $ pip install zstandard"
+            ) from None
+
+    return _zstandard
+
+
+def _import_lz4() -> ModuleType:
+    """
+    Import module 'lz4.frame' on first use.
+
+    Raises:
+        ModuleNotFoundError: If package 'lz4' is not installed.
+
+    Returns:
+        ModuleType: Module 'lz4.frame'.
+    """
+    global _lz4_frame
+
+    if _lz4_frame is None:
+        try:
+            import lz4.frame as _lz4_frame
+        except ImportError:
+            raise ModuleNotFoundError(
+                "No module named 'lz4'. Install with $ pip install lz4"
+            ) from None
+
+    return _lz4_frame
+
+
+def _infer_compression(name: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Infer compression from a (lowercase) filename.
+
+    Args:
+        name (str): Lowercase filename, without parent directories.
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: Compression and tar mode suffix (e.g.
+            ':gz'). Both are None if compression cannot be inferred.
+    """
+    parts = name.rsplit(".", 2)
+
+    # Two-part extensions (e.g. '.tar.gz') take precedence over single ones
+    if len(parts) == 3:
+        key = "." + parts[1] + "." + parts[2]
+        if key in _INFER_TABLE:
+            return _INFER_TABLE[key]
+
+    if len(parts) > 1:
+        return _INFER_TABLE.get("." + parts[-1], (None, None))
+
+    # Compression cannot be inferred, assume no compression
+    return None, None
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def _read_cached(
+    reader: Callable[..., Any], filename: str, mtime_ns: int, size: int, *args: Any
+) -> Any:
+    """
+    Call `reader(filename, *args)`, cached on the file's modification time and size.
+
+    Args:
+        reader (Callable[..., Any]): Function to read the file.
+        filename (str): Absolute path of file to read.
+        mtime_ns (int): Modification time of file in nanoseconds. Only used as key.
+        size (int): Size of file in bytes. Only used as key.
+        *args (Any): Additional positional arguments passed on to `reader`.
+
+    Returns:
+        Any: Return value of `reader`.
+    """
+    return reader(filename, *args)
+
+
+def read_cached(
+    reader: Callable[..., Any], filename: Union[str, Path], *args: Any
+) -> Any:
+    """
+    Read a file with `reader`, reusing the result while the file is unchanged.
+
+    Results are cached by absolute path, modification time and size of the file, so a
+    modified file is read again. Up to 256 results are kept (least recently used are
+    evicted first).
+
+    Args:
+        reader (Callable[..., Any]): Function to read the file, called as
+            `reader(filename, *args)`.
+        filename (Union[str, Path]): File to read.
+        *args (Any): Additional positional arguments passed on to `reader`. Must be
+            hashable.
+
+    Returns:
+        Any: Return value of `reader`. The same object is returned for repeated reads
+            and must not be modified.
+    """
+    try:
+        stat_result = os.stat(filename)
+    except OSError:
+        # Let `reader` raise its usual error
+        return reader(filename, *args)
+
+    return _read_cached(
+        reader,
+        os.path.abspath(filename),
+        stat_result.st_mtime_ns,
+        stat_result.st_size,
+        *args,
+    )
+
+
+def _open_raw(
+    filename: Union[str, Path], mode: str, buffer_size: int = _BUFFER_SIZE
+) -> IO[bytes]:
+    """
+    Open the underlying binary file of a (de)compressor with a large buffer.
+
+    Args:
+        filename (Union[str, Path]): File to open.
+        mode (str): File access mode. Only the first character is used.
+        buffer_size (int, optional): Buffer size in bytes. Defaults to 1 MiB.
+
+    Returns:
+        IO[bytes]: Binary file handle.
+    """
+    file_handle = open(filename, mode=mode[0] + "b", buffering=buffer_size)
+    if mode.startswith("r"):
+        _advise_sequential(file_handle)
+
+    return file_handle
+
+
+def _advise_sequential(file_handle: IO) -> None:
+    """
+    Tell the kernel that a file is read sequentially, to read ahead more aggressively.
+
+    Only a hint, hence a no-op on platforms without `os.posix_fadvise()` (e.g. Windows,
+    macOS).
+
+    Args:
+        file_handle (IO): File handle opened for reading.
+    """
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(file_handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            # E.g. not supported by the file system
+            pass
+
+
+def _buffered(
+    file_handle: IO, mode: str, buffer_size: int = _BUFFER_SIZE
+) -> Union[io.BufferedReader, io.BufferedWriter]:
+    """
+    Wrap a (de)compressor stream with a large buffer.
+
+    Args:
+        file_handle (IO): Binary file handle of the (de)compressor.
+        mode (str): File access mode of `file_handle`.
+        buffer_size (int, optional): Buffer size in bytes. Defaults to 1 MiB.
+
+    Returns:
+        Union[io.BufferedReader, io.BufferedWriter]: Buffered reader if `mode` starts
+            with 'r', else buffered writer.
+    """
+    if mode.startswith("r"):
+        return io.BufferedReader(file_handle, buffer_size=buffer_size)
+
+    return io.BufferedWriter(file_handle, buffer_size=buffer_size)
+
+
+def iter_line_batches(
+    file_handle: IO[AnyStr], is_binary: bool, size: int = _BUFFER_SIZE
+) -> Iterator[List[AnyStr]]:
+    """
+    Read a file in large blocks and yield the lines of each block.
+
+    Splitting whole blocks at once is considerably faster than iterating over the
+    file handle line by line.
+
+    Args:
+        file_handle (IO[AnyStr]): File handle opened for reading.
+        is_binary (bool): Whether `file_handle` returns bytes (True) or str (False).
+        size (int, optional): Number of bytes (or characters) to read at once.
+            Defaults to 1 MiB.
+
+    Yields:
+        Iterator[List[AnyStr]]: Lines without trailing newline characters. A newline at
+            the end of the file does not produce an empty line.
+    """
+    newline = b"\n" if is_binary else "\n"
+    empty = newline[:0]
+
+    # Parts of a line that spans multiple blocks
+    pending: List[AnyStr] = []
+    while True:
+        block = file_handle.read(size)
+        if not block:
+            break
+
+        lines = block.split(newline)
+        if len(lines) == 1:
+            # No newline in block, line continues in next block
+            pending.append(block)
+            continue
+
+        if pending:
+            pending.append(lines[0])
+            lines[0] = empty.join(pending)
+
+        # Last line is incomplete (or empty if block ends with a newline)
+        pending = [lines.pop()]
+
+        yield lines
+
+    last_line = empty.join(pending)
+    if last_line:
+        yield [last_line]
+
+
+def iter_chunks(batches: Iterator[Iterable[T]], chunksize: int) -> Iterator[List[T]]:
+    """
+    Regroup batches of items into lists of `chunksize` items.
+
+    Kept free of argument validation and file handling, such that the interpreter can
+    specialize the loop.
+
+    Args:
+        batches (Iterator[Iterable[T]]): Batches of items, e.g. from
+            `iter_line_batches()`.
+        chunksize (int): Number of items per chunk. Must be 1 or greater.
+
+    Yields:
+        Iterator[List[T]]: Lists of `chunksize` items. The last list may be shorter.
+    """
+    chunk: List[T] = []
+    for batch in batches:
+        chunk.extend(batch)
+
+        # Yield all full chunks, keep the remainder for the next batches
+        n_full = len(chunk) - len(chunk) % chunksize
+        if n_full:
+            for start in range(0, n_full, chunksize):
+                yield chunk[start : start + chunksize]
+
+            chunk = chunk[n_full:]
+
+    # If `chunk` contains items after all batches have been read, yield it
+    if chunk:
+        yield chunk
+
+
+def iter_in_background(iterator: Iterator[T], size: int = 2) -> Iterator[T]:
+    """
+    Consume an iterator in a background thread, up to `size` items ahead.
+
+    This overlaps producing items with processing them in the calling thread, if
+    producing releases the GIL (e.g. reading and decompressing files).
+
+    Args:
+        iterator (Iterator[T]): Iterator to consume.
+        size (int, optional): Maximum number of items to produce ahead. Defaults to 2.
+
+    Yields:
+        Iterator[T]: Items of `iterator`, in order. Exceptions raised by `iterator`
+            are re-raised in the calling thread.
+    """
+    items: "queue.Queue[Tuple[bool, Any]]" = queue.Queue(maxsize=size)
+    stop = threading.Event()
+
+    def put(is_last: bool, value: Any) -> bool:
+        # Wait for a free slot, unless the consumer has stopped
+        while not stop.is_set():
+            try:
+                items.put((is_last, value), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterator:
+                if not put(False, item):
+                    return
+        except BaseException as error:
+            put(True, error)
+        else:
+            put(True, None)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            is_last, value = items.get()
+            if is_last:
+                if value is not None:
+                    raise value
+                return
+            yield value
+    finally:
+        # Wait for the producer before the caller closes the underlying file
+        stop.set()
+        thread.join()
+
+
+@contextmanager
+def map_file(
+    filename: Union[str, Path],
+    mode: str,
+    compression: Optional[str] = None,
+) -> Iterator[Optional[mmap.mmap]]:
+    """
+    Memory-map a large, uncompressed file for reading as a context manager.
+
+    Args:
+        filename (Union[str, Path]): File to map.
+        mode (str): File access mode. Only 'r' is supported.
+        compression (Optional[str], optional): File compression method, see
+            `open_file()`. Only None, or 'infer' for a filename without compression
+            extension, is supported. Defaults to None.
+
+    Yields:
+        Iterator[Optional[mmap.mmap]]: Read-only memory map of the file, or None if the
+            file is not mapped (e.g. mode is not 'r', file is compressed, missing or
+            smaller than 1 MiB). In that case, use `open_file()` instead.
+    """
+    filename = os.fspath(filename)
+
+    if compression == "infer":
+        compression = _infer_compression(os.path.basename(filename).lower())[0]
+
+    if mode != "r" or compression is not None:
+        yield None
+        return
+
+    try:
+        stat_result = os.stat(filename)
+    except OSError:
+        yield None
+        return
+
+    if not stat.S_ISREG(stat_result.st_mode) or stat_result.st_size < _MMAP_THRESHOLD:
+        yield None
+        return
+
+    with open(filename, mode="rb") as file_handle:
+        with mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # Only a hint, hence skipped on platforms without madvise() (e.g. Windows)
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+
+            yield mapped
+
 
 @contextmanager
 def open_file(
@@ -36,6 +477,8 @@ def open_file(
     mode: str,
     compression: Optional[str] = None,
     level: Optional[int] = None,
+    write_buffer_size: int = _BUFFER_SIZE,
+    workers: Optional[int] = None,
 ) -> Iterator[Tuple[ContainerType, IO, bool]]:
     """
     Open a file with optional compression as a context manager.
@@ -45,15 +488,23 @@ def open_file(
         mode (str): File access mode. For 'tar' and 'zip' compression, append mode ('a')
             is not supported.
         compression (Optional[str], optional): File compression method. Options: 'bz2',
-            'gzip', 'tar', 'xz', 'zip', 'zstd', None (no compression), or 'infer'. Use
-            'infer' for automatic detection based on file extension. For tar archives,
-            use 'infer' with appropriate file extensions ('.tar.bz2', '.tar.gz', '.tgz',
-            '.tar.xz') or use 'tar' with `mode` ending in ':bz2', ':gz', or ':xz'.
-            Defaults to 'infer'.
+            'gzip', 'lz4', 'tar', 'xz', 'zip', 'zstd', None (no compression), or
+            'infer'. Use 'infer' for automatic detection based on file extension. For
+            tar archives, use 'infer' with appropriate file extensions ('.tar.bz2',
+            '.tar.gz', '.tgz', '.tar.xz') or use 'tar' with `mode` ending in ':bz2',
+            ':gz', or ':xz'. Defaults to 'infer'.
         level (Optional[int], optional): Compression level. Only used if `compression`
             is not None. Valid values depend on the compression method, typically
-            ranging from 0 (no compression) to 9 (highest compression). If None, the
-            default level for each compression method is used. Defaults to None.
+            ranging from 0 (no compression) to 9 (highest compression). If None, a
+            default favoring speed is used: 6 for 'gzip', 3 for 'xz' and 'zstd', 9 for
+            'bz2'. Defaults to None.
+        write_buffer_size (int, optional): Size in bytes of the buffers in front of the
+            file and the compressor when writing. Larger buffers invoke the compressor
+            less often. Ignored when reading. Defaults to 1 MiB.
+        workers (Optional[int], optional): Number of threads compressing in parallel
+            when writing 'gzip' (requires package 'zlib-ng', else ignored) or 'zstd'
+            files. Use -1 for all CPUs. If None, a single thread compresses in the
+            calling thread. Defaults to None.
 
     Yields:
         Iterator[Tuple[ContainerType, IO, bool]]: A tuple containing:
@@ -75,71 +526,90 @@ def open_file(
         zipfile.BadZipFile: If `mode` is 'r' and file is not a valid zipfile.
         ModuleNotFoundError: If `compression` is 'zstd' and the zstandard module is not
             installed.
+        ModuleNotFoundError: If `compression` is 'lz4' and the lz4 module is not
+            installed.
 
     Note:
         This function returns a context manager and is best used with a 'with'
         statement. The ContainerType in the returned tuple is defined as:
         ContainerType = Optional[Union[object, "zstandard.ZstdCompressor"]]
     """
+    # Convert a path-like `filename` once, instead of in every call below
+    filename = os.fspath(filename)
+
+    # Stat `filename` once, it may not exist yet when writing. A path below a regular
+    # file also does not exist, other errors (e.g. PermissionError) are raised.
+    try:
+        stat_result: Optional[os.stat_result] = os.stat(filename)
+    except (FileNotFoundError, NotADirectoryError):
+        stat_result = None
+
+    st_mode = stat_result.st_mode if stat_result is not None else None
+
     # Check: `filename` cannot be a directory
-    filepath = Path(filename)
-    if filepath.is_dir():
+    if st_mode is not None and stat.S_ISDIR(st_mode):
         raise IsADirectoryError("Must be a file, not a directory: '%s'" % filename)
 
     # Check if file exists when opening in read mode
-    if mode.startswith("r") and not filepath.is_file():
+    if mode.startswith("r") and (st_mode is None or not stat.S_ISREG(st_mode)):
         raise FileNotFoundError("No such file: '%s'" % filename)
 
+    if mode.startswith("r"):
+        buffer_size = _BUFFER_SIZE
+        # Allocating the buffer of the underlying file dominates opening small files,
+        # hence size it by the file size (`stat_result` is not None, as checked above)
+        file_size = stat_result.st_size  # type: ignore[union-attr]
+        raw_buffer_size = min(_BUFFER_SIZE, max(file_size, io.DEFAULT_BUFFER_SIZE))
+    else:
+        buffer_size = raw_buffer_size = write_buffer_size
+
+    # Fast path: no compression, skip validation, inference and dispatch below
+    if compression is None:
+        with open(filename, mode=mode, buffering=raw_buffer_size) as file_handle:
+            if mode.startswith("r"):
+                _advise_sequential(file_handle)
+
+            yield None, file_handle, False
+        return
+
     # Check compression
-    valid_compression_types = (None, "infer") + SUPPORTED_COMPRESSION_TYPES
-    if compression not in valid_compression_types:
+    if compression not in _VALID_COMPRESSION_TYPES:
         raise ValueError(
             "Unsupported compression: %s\nValid compression types are %s"
-            % (compression, valid_compression_types)
+            % (compression, _VALID_COMPRESSION_TYPES)
         )
 
     # Infer compression based on filename extension
     if compression == "infer":
-        filepath_str = filepath.name.lower()
-
-        if filepath_str.endswith(".tar"):
-            compression = "tar"
-            level = None
-        elif filepath_str.endswith(".tar.bz2"):
-            compression = "tar"
-            if mode in ("r", "w", "x"):
-                mode += ":bz2"
-        elif filepath_str.endswith(".tar.gz") or filepath_str.endswith(".tgz"):
-            compression = "tar"
-            if mode in ("r", "w", "x"):
-                mode += ":gz"
-        elif filepath_str.endswith(".tar.xz"):
-            compression = "tar"
-            if mode in ("r", "w", "x"):
-                mode += ":xz"
-        elif filepath_str.endswith(".bz2"):
-            compression = "bz2"
-        elif filepath_str.endswith(".gz"):
-            compression = "gzip"
-        elif filepath_str.endswith(".xz"):
-            compression = "xz"
-        elif filepath_str.endswith(".zip"):
-            compression = "zip"
-        elif filepath_str.endswith(".zst"):
-            compression = "zstd"
-        else:
-            # Compression cannot be inferred, assume no compression
-            compression = None
-    elif (compression == "tar") & (len(mode) == 1):
+        compression, mode_suffix = _infer_compression(
+            os.path.basename(filename).lower()
+        )
+
+        if compression == "tar":
+            if mode_suffix is None:
+                level = None
+            elif mode in ("r", "w", "x"):
+                mode += mode_suffix
+    elif compression == "tar" and len(mode) == 1:
         level = None
 
     if mode.startswith("r"):
         # Reading mode does not require a compression level
         level = None
+    elif level is None:
+        if compression == "tar":
+            # Compression of tar archive is given by `mode` (e.g. 'w:gz'), if any
+            codec = mode.partition(":")[2]
+            level = _DEFAULT_LEVELS.get("gzip" if codec == "gz" else codec)
+        else:
+            level = _DEFAULT_LEVELS.get(compression)
 
     kwargs: Dict[str, Any] = {"mode": mode}
     if compression is None:
-        with open(filename, **kwargs) as file_handle:
+        with open(filename, buffering=raw_buffer_size, **kwargs) as file_handle:
+            if mode.startswith("r"):
+                _advise_sequential(file_handle)
+
             yield None, file_handle, False
     elif compression == "tar":
         if level:
@@ -148,16 +618,17 @@ def open_file(
             else:
                 kwargs["compresslevel"] = level
 
+        # Raises tarfile.ReadError if file is not a valid tarfile
         container_handle = tarfile.open(filename, **kwargs)
         try:
             if mode.startswith("r"):
-                if not tarfile.is_tarfile(filename):
-                    raise tarfile.ReadError(filename)
-
-                file_list = container_handle.getnames()
-                if len(file_list) != 1:
+                # Read at most 2 member headers instead of listing all members
+                member = container_handle.next()
+                if member is None or container_handle.next() is not None:
                     raise ValueError("tar archive must contain exactly 1 file")
-                file_handle = container_handle.extractfile(file_list[0])
+                file_handle = _buffered(
+                    container_handle.extractfile(member), mode, buffer_size
+                )
             elif mode.startswith(("w", "x")):
                 file_handle = tarfile.TarInfo(name="data")
             elif mode.startswith("a"):
@@ -170,31 +641,68 @@ def open_file(
         if level:
             kwargs["compresslevel"] = level
 
-        with bz2.BZ2File(filename, **kwargs) as file_handle:
-            yield None, file_handle, True
+        with _open_raw(filename, mode, raw_buffer_size) as raw_handle:
+            with bz2.BZ2File(raw_handle, **kwargs) as file_handle:
+                with _buffered(file_handle, mode, buffer_size) as buffered_handle:
+                    yield None, buffered_handle, True
     elif compression == "gzip":
         if level:
             kwargs["compresslevel"] = level
 
-        with gzip.GzipFile(filename, **kwargs) as file_handle:
-            yield None, file_handle, True
+        # isal only supports compression levels 0-3, hence only used for reading
+        if mode.startswith("r"):
+            gzip_module = _igzip
+        else:
+            gzip_module = _gzip_ng
+            # Omit the timestamp from the header for reproducible output
+            kwargs["mtime"] = 0
+
+        with _open_raw(filename, mode, raw_buffer_size) as raw_handle:
+            if (
+                workers not in (None, 1)
+                and _gzip_ng_threaded is not None
+                and not mode.startswith("r")
+            ):
+                # Compress blocks in parallel threads (also writes mtime=0)
+                with _gzip_ng_threaded.open(
+                    raw_handle,
+                    mode=mode[0] + "b",
+                    compresslevel=level or _DEFAULT_LEVELS["gzip"],
+                    threads=workers,
+                    block_size=buffer_size,
+                ) as buffered_handle:
+                    yield None, buffered_handle, True
+                return
+
+            with gzip_module.GzipFile(fileobj=raw_handle, **kwargs) as file_handle:
+                with _buffered(file_handle, mode, buffer_size) as buffered_handle:
+                    yield None, buffered_handle, True
+    elif compression == "lz4":
+        lz4_frame = _import_lz4()
+        if level:
+            kwargs["compression_level"] = level
+
+        with _open_raw(filename, mode, raw_buffer_size) as raw_handle:
+            with lz4_frame.LZ4FrameFile(raw_handle, **kwargs) as file_handle:
+                with _buffered(file_handle, mode, buffer_size) as buffered_handle:
+                    yield None, buffered_handle, True
     elif compression == "xz":
         kwargs["format"] = lzma.FORMAT_XZ
         if level:
             kwargs["preset"] = level
 
-        with lzma.LZMAFile(filename, **kwargs) as file_handle:
-            yield None, file_handle, True
+        with _open_raw(filename, mode, raw_buffer_size) as raw_handle:
+            with lzma.LZMAFile(raw_handle, **kwargs) as file_handle:
+                with _buffered(file_handle, mode, buffer_size) as buffered_handle:
+                    yield None, buffered_handle, True
     elif compression == "zip":
         if level:
             kwargs["compresslevel"] = level
 
+        # Raises zipfile.BadZipFile if file is not a valid zipfile
         container_handle = zipfile.ZipFile(filename, **kwargs)
         try:
             if mode == "r":
-                if not zipfile.is_zipfile(filename):
-                    raise zipfile.BadZipFile(filename)
-
                 file_list = container_handle.namelist()
                 if len(file_list) != 1:
                     raise ValueError("zip archive must contain exactly 1 file")
@@ -208,18 +716,36 @@ def open_file(
                 raise ValueError("zip does not support append mode")
 
             with container_handle.open(file_in_container, mode=mode) as file_handle:
-                yield container_handle, file_handle, True
+                with _buffered(file_handle, mode, buffer_size) as buffered_handle:
+                    yield container_handle, buffered_handle, True
         finally:
             container_handle.close()
     elif compression == "zstd":
-        if not _HAVE_ZSTD:
-            raise ModuleNotFoundError(
-                "No module named 'zstandard'. Install with $ pip install zstandard"
-            )
-        if level:
-            kwargs["cctx"] = zstandard.ZstdCompressor(level=level)
+        zstandard = _import_zstandard()
 
-        with zstandard.open(filename, **kwargs) as file_handle:
-            yield None, file_handle, False
+        raw_handle = _open_raw(filename, mode, raw_buffer_size)
+        try:
+            if mode.startswith("r"):
+                # Each reader needs its own context, a context shared between open
+                # streams corrupts them
+                decompressor = zstandard.ZstdDecompressor()
+                file_handle = decompressor.stream_reader(
+                    raw_handle, read_size=_BUFFER_SIZE, read_across_frames=True
+                )
+            else:
+                # threads=0 compresses in the calling thread, like zstandard.open(),
+                # and avoids starting a thread pool for every (small) file
+                threads = 0 if workers in (None, 1) else workers
+                compressor = zstandard.ZstdCompressor(
+                    level=level or _DEFAULT_LEVELS["zstd"], threads=threads
+                )
+                file_handle = compressor.stream_writer(
+                    raw_handle, write_size=buffer_size
+                )
+
+            with _buffered(file_handle, mode, buffer_size) as buffered_handle:
+                yield None, buffered_handle, True
+        finally:
+            raw_handle.close()
     else:
         raise NotImplementedError(compression)
@@ -2,19 +2,243 @@
 JSON file I/O
 """
 
+import functools
 import json
+import math
 import tarfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
 from io import BytesIO
+from itertools import islice
 from pathlib import Path
-from typing import Any, Generator, List, Optional, Union
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from .common import (
+    iter_chunks,
+    iter_in_background,
+    iter_line_batches,
+    map_file,
+    open_file,
+    read_cached,
+)
+
+# Number of serialized bytes to collect before writing in `write_jsonl()`
+_WRITE_BATCH_SIZE = 1 << 16
+_JSON_WRITE_MODES = ("w", "x")
+_JSONL_WRITE_MODES = ("w", "x", "a")
+
+# Faster JSON backends, used if installed (orjson is preferred over msgspec)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if orjson is not None:
+    _fast_loads = orjson.loads
+    _fast_dumps = orjson.dumps
+    _fast_dumps_line = functools.partial(orjson.dumps, option=orjson.OPT_APPEND_NEWLINE)
+    _DECODE_ERRORS: Tuple[Type[Exception], ...] = (orjson.JSONDecodeError,)
+    _ENCODE_ERRORS: Tuple[Type[Exception], ...] = (TypeError,)
+elif msgspec is not None:
+    # Reuse a single encoder and decoder, instead of creating them per call
+    _fast_loads = msgspec.json.Decoder().decode
+    _fast_dumps = msgspec.json.Encoder().encode
+    _fast_dumps_line = None
+    _DECODE_ERRORS = (msgspec.DecodeError,)
+    _ENCODE_ERRORS = (msgspec.EncodeError, TypeError)
+else:
+    _fast_loads = None
+    _fast_dumps = None
+    _fast_dumps_line = None
+
+# Reuse a single stdlib decoder and encoder for the fallback, instead of passing through
+# the argument handling of json.loads() and json.dumps() on every call
+_json_decode = json.JSONDecoder().decode
+_json_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def _loads(content: Union[str, bytes, memoryview]) -> Any:
+    """
+    Deserialize a JSON document, using the fastest installed backend.
+
+    Args:
+        content (Union[str, bytes, memoryview]): JSON document. Bytes must be UTF-8
+            encoded.
+
+    Returns:
+        Any: A single JSON-serializable object.
+    """
+    if _fast_loads is not None:
+        try:
+            return _fast_loads(content)
+        except _DECODE_ERRORS:
+            # Faster backends are stricter than json (e.g. NaN, integers beyond 64
+            # bit), hence fall back to json for documents that they reject
+            pass
 
-from .common import open_file
+    if not isinstance(content, str):
+        # Like json.loads(), ignore a leading byte order mark
+        content = str(content, "utf-8-sig")
+
+    return _json_decode(content)
+
+
+@functools.lru_cache(maxsize=32)
+def _get_loads(schema: Optional[Any] = None) -> Callable[[Any], Any]:
+    """
+    Get the function to deserialize JSON documents, optionally into a typed schema.
+
+    Args:
+        schema (Optional[Any], optional): Type to decode into, see `read_json()`. If
+            None, returns `_loads()`. Defaults to None.
+
+    Raises:
+        ModuleNotFoundError: If `schema` is not None and package 'msgspec' is not
+            installed.
+
+    Returns:
+        Callable[[Any], Any]: Function that deserializes a JSON document.
+    """
+    if schema is None:
+        return _loads
+
+    if msgspec is None:
+        raise ModuleNotFoundError(
+            "No module named 'msgspec'. Install with: $ pip install msgspec"
+        )
+
+    return msgspec.json.Decoder(schema).decode
+
+
+def _has_non_finite(data: Any) -> bool:
+    """
+    Check whether an object contains NaN or infinite floats.
+
+    Args:
+        data (Any): JSON-serializable object. Values of nested dicts, lists and tuples
+            are searched, without a call per value.
+
+    Returns:
+        bool: True if `data` contains a float that is NaN or infinite.
+    """
+    containers = [data]
+    while containers:
+        container = containers.pop()
+        if isinstance(container, dict):
+            values: Iterable[Any] = container.values()
+        elif isinstance(container, (list, tuple)):
+            values = container
+        else:
+            values = (container,)
+
+        for value in values:
+            if isinstance(value, float):
+                if not math.isfinite(value):
+                    return True
+            elif isinstance(value, (dict, list, tuple)):
+                containers.append(value)
+
+    return False
+
+
+def _dumps(data: Any) -> bytes:
+    """
+    Serialize an object to a compact, UTF-8 encoded JSON document, using the fastest
+    installed backend.
+
+    Args:
+        data (Any): JSON-serializable object.
+
+    Returns:
+        bytes: JSON document.
+    """
+    if _fast_dumps is not None:
+        try:
+            content = _fast_dumps(data)
+        except _ENCODE_ERRORS:
+            # Fall back to json for objects that faster backends cannot serialize
+            # (e.g. integers beyond 64 bit, non-string keys)
+            pass
+        else:
+            # Faster backends write NaN and infinity as null, unlike json, hence only
+            # search `data` for them if the document contains null
+            if b"null" not in content or not _has_non_finite(data):
+                return content
+
+    return _json_encode(data).encode()
+
+
+def _dumps_line(data: Any) -> bytes:
+    """
+    Serialize an object like `_dumps()`, followed by a newline character.
+
+    Args:
+        data (Any): JSON-serializable object.
+
+    Returns:
+        bytes: JSON document with trailing newline.
+    """
+    if _fast_dumps_line is None:
+        return _dumps(data) + b"\n"
+
+    try:
+        # Appends the newline without copying the serialized object
+        content = _fast_dumps_line(data)
+    except _ENCODE_ERRORS:
+        pass
+    else:
+        # See `_dumps()`, NaN and infinity are written as null
+        if b"null" not in content or not _has_non_finite(data):
+            return content
+
+    # Fall back to json directly, `_dumps()` would serialize with orjson again
+    return _json_encode(data).encode() + b"\n"
+
+
+def _binary(file_handle: IO, is_binary: bool) -> IO[bytes]:
+    """
+    Get the binary file handle underlying a file handle.
+
+    JSON is UTF-8 encoded and all backends parse and serialize bytes directly, hence
+    reading and writing bytes skips decoding and encoding the content as str. This
+    also keeps the encoding UTF-8, independent of the locale.
+
+    Args:
+        file_handle (IO): File handle opened for reading or writing, not used yet.
+        is_binary (bool): Whether `file_handle` handles bytes (True) or str (False).
+
+    Returns:
+        IO[bytes]: `file_handle` if binary, else its underlying buffer.
+    """
+    if is_binary:
+        return file_handle
+
+    # Uncompressed files opened with a binary mode (e.g. 'rb') are already binary
+    return getattr(file_handle, "buffer", file_handle)
 
 
 def read_json(
     filename: Union[str, Path],
     mode: str = "r",
     compression: Optional[str] = "infer",
+    cache: bool = False,
+    schema: Optional[Any] = None,
 ) -> Any:
     """
     Read a JSON file.
@@ -23,29 +247,44 @@ def read_json(
         filename (Union[str, Path]): File to read.
         mode (str, optional): File access mode. Must start with 'r'. Defaults to 'r'.
         compression (Optional[str], optional): File compression method. Options: 'bz2',
-            'gzip', 'tar', 'xz', 'zip', 'zstd', None (no compression), or 'infer'. Use
-            'infer' for automatic detection based on file extension. For tar archives,
-            use 'infer' with appropriate file extensions ('.tar.bz2', '.tar.gz', '.tgz',
-            '.tar.xz') or use 'tar' with `mode` set to 'r:bz2', 'r:gz', or 'r:xz'.
-            Defaults to 'infer'.
+            'gzip', 'lz4', 'tar', 'xz', 'zip', 'zstd', None (no compression), or
+            'infer'. Use 'infer' for automatic detection based on file extension. For
+            tar archives, use 'infer' with appropriate file extensions ('.tar.bz2',
+            '.tar.gz', '.tgz', '.tar.xz') or use 'tar' with `mode` set to 'r:bz2',
+            'r:gz', or 'r:xz'. Defaults to 'infer'.
+        cache (bool, optional): If True, cache the result by path, modification time
+            and size of the file, and return the cached result while the file is
+            unchanged. The cached object is shared between calls and must not be
+            modified. Defaults to False.
+        schema (Optional[Any], optional): If not None, decode into instances of this
+            type (e.g. a subclass of `msgspec.Struct`) with msgspec, which also
+            validates the data. Requires package 'msgspec'. Defaults to None.
 
     Raises:
+        ModuleNotFoundError: If `schema` is not None and package 'msgspec' is not
+            installed.
         ValueError: If `mode` does not start with 'r'.
 
     Returns:
-        Any: A single JSON-serializable object.
+        Any: A single JSON-serializable object, or an instance of `schema`.
     """
+    if cache:
+        return read_cached(read_json, filename, mode, compression, False, schema)
+
     # Check mode
-    if not mode.startswith("r"):
+    if mode[:1] != "r":
         raise ValueError("Unrecognized mode: %s\nValid modes start with: 'r'" % mode)
 
-    with open_file(filename, mode, compression) as (_, file_handle, is_binary):
-        content = file_handle.read()
+    loads = _get_loads(schema)
 
-        if is_binary:
-            content = content.decode()
+    # Large, uncompressed files are parsed directly from a memory map
+    with map_file(filename, mode, compression) as mapped:
+        if mapped is not None:
+            with memoryview(mapped) as content:
+                return loads(content)
 
-        return json.loads(content)
+    with open_file(filename, mode, compression) as (_, file_handle, is_binary):
+        return loads(_binary(file_handle, is_binary).read())
 
 
 def write_json(
@@ -54,6 +293,8 @@ def write_json(
     mode: str = "w",
     compression: Optional[str] = "infer",
     level: Optional[int] = None,
+    write_buffer_size: int = 1 << 20,
+    workers: Optional[int] = None,
 ) -> None:
     """
     Write a JSON-serializable object to a file.
@@ -64,45 +305,53 @@ def write_json(
         mode (str, optional): File access mode. Must start with 'w' or 'x'. Defaults to
             'w'.
         compression (Optional[str], optional): File compression method. Options: 'bz2',
-            'gzip', 'tar', 'xz', 'zip', 'zstd', None (no compression), or 'infer'. Use
-            'infer' for automatic detection based on file extension. For tar archives,
-            use 'infer' with appropriate file extensions ('.tar.bz2', '.tar.gz', '.tgz',
-            '.tar.xz') or use 'tar' with `mode` ending in ':bz2', ':gz', or ':xz'.
-            Defaults to 'infer'.
+            'gzip', 'lz4', 'tar', 'xz', 'zip', 'zstd', None (no compression), or
+            'infer'. Use 'infer' for automatic detection based on file extension. For
+            tar archives, use 'infer' with appropriate file extensions ('.tar.bz2',
+            '.tar.gz', '.tgz', '.tar.xz') or use 'tar' with `mode` ending in ':bz2',
+            ':gz', or ':xz'. Defaults to 'infer'.
         level (Optional[int], optional): Compression level. Only used if `compression`
             is not None. Valid values depend on the compression method, typically
-            ranging from 0 (no compression) to 9 (highest compression). If None, the
-            default level for each compression method is used. Defaults to None.
+            ranging from 0 (no compression) to 9 (highest compression). If None, a
+            default favoring speed is used: 6 for 'gzip', 3 for 'xz' and 'zstd', 9 for
+            'bz2'. Defaults to None.
+        write_buffer_size (int, optional): Size in bytes of the write buffers in front
+            of the file and the compressor. Defaults to 1 MiB.
+        workers (Optional[int], optional): Number of threads compressing in parallel,
+            for 'gzip' (requires package 'zlib-ng') and 'zstd'. Use -1 for all CPUs. If
+            None, a single thread compresses in the calling thread. Defaults to None.
 
     Raises:
         ValueError: If `mode` does not start with 'w' or 'x'.
 
     Note:
-        A newline character is added at the end of the JSON content.
+        A newline character is added at the end of the JSON content. The content is
+        serialized compactly (without whitespace, e.g. '{"A":1}') and written as
+        UTF-8, with non-ASCII characters unescaped, regardless of the locale or the
+        installed JSON backend. Non-finite floats are written as NaN, Infinity and -Infinity, like
+        json does.
     """
     # Check mode
-    valid_modes = ("w", "x")
-    if not mode.startswith(valid_modes):
+    if mode[:1] not in _JSON_WRITE_MODES:
         raise ValueError(
-            "Unrecognized mode: %s\nValid modes start with: %s" % (mode, valid_modes)
+            "Unrecognized mode: %s\nValid modes start with: %s"
+            % (mode, _JSON_WRITE_MODES)
         )
 
-    with open_file(filename, mode, compression, level) as (
+    with open_file(filename, mode, compression, level, write_buffer_size, workers) as (
         container_handle,
         file_handle,
         is_binary,
     ):
-        content = json.dumps(data) + "\n"
-
-        if is_binary:
-            content = content.encode()
+        content = _dumps_line(data)
 
         # Write out
         if isinstance(file_handle, tarfile.TarInfo):
+            # BytesIO shares the buffer of `content`, instead of copying it
             file_handle.size = len(content)
             container_handle.addfile(file_handle, fileobj=BytesIO(content))
         else:
-            file_handle.write(content)
+            _binary(file_handle, is_binary).write(content)
 
 
 def _read_jsonl_generator(
@@ -110,6 +359,8 @@ def _read_jsonl_generator(
     mode: str = "r",
     compression: Optional[str] = "infer",
     chunksize: int = 1,
+    prefetch: bool = False,
+    schema: Optional[Any] = None,
 ) -> Generator[List[Any], Any, None]:
     """
     Generator that reads a JSON Lines file in chunks.
@@ -118,50 +369,46 @@ def _read_jsonl_generator(
         filename (Union[str, Path]): File to read.
         mode (str, optional): File access mode. Must start with 'r'. Defaults to 'r'.
         compression (Optional[str], optional): File compression method. Options: 'bz2',
-            'gzip', 'tar', 'xz', 'zip', 'zstd', None (no compression), or 'infer'. Use
-            'infer' for automatic detection based on file extension. For tar archives,
-            use 'infer' with appropriate file extensions ('.tar.bz2', '.tar.gz', '.tgz',
-            '.tar.xz') or use 'tar' with `mode` set to 'r:bz2', 'r:gz', or 'r:xz'.
-            Defaults to 'infer'.
+            'gzip', 'lz4', 'tar', 'xz', 'zip', 'zstd', None (no compression), or
+            'infer'. Use 'infer' for automatic detection based on file extension. For
+            tar archives, use 'infer' with appropriate file extensions ('.tar.bz2',
+            '.tar.gz', '.tgz', '.tar.xz') or use 'tar' with `mode` set to 'r:bz2',
+            'r:gz', or 'r:xz'. Defaults to 'infer'.
         chunksize (int, optional): Number of JSON-serializable objects (= lines) to read
             as a chunk. Defaults to 1.
+        prefetch (bool, optional): If True, read and decompress the file in a
+            background thread while parsing. This speeds up reading compressed files
+            on multi-core machines. Defaults to False.
+        schema (Optional[Any], optional): If not None, decode into instances of this
+            type (e.g. a subclass of `msgspec.Struct`) with msgspec, which also
+            validates the data. Requires package 'msgspec'. Defaults to None.
 
     Raises:
+        ModuleNotFoundError: If `schema` is not None and package 'msgspec' is not
+            installed.
         ValueError: If `mode` does not start with 'r'.
         ValueError: If `chunksize` is not 1 or greater.
 
     Yields:
-        Generator[List[Any], Any, None]: Lists of JSON-serializable objects.
+        Generator[List[Any], Any, None]: Lists of JSON-serializable objects, or of
+            instances of `schema`.
     """
     # Check mode
-    if not mode.startswith("r"):
+    if mode[:1] != "r":
         raise ValueError("Unrecognized mode: %s\nValid modes start with: r" % mode)
 
     # Check chunksize
     if chunksize < 1:
         raise ValueError("chunksize must be 1 or greater")
 
-    with open_file(filename, mode, compression) as (_, file_handle, is_content_binary):
-        chunk: List[Any] = []
-        counter = 0
-        for line in file_handle:
-            if is_content_binary:
-                line = line.decode()
-
-            chunk.append(json.loads(line))
-            counter += 1
+    loads = _get_loads(schema)
 
-            # Once `chunksize` is reached, yield `chunk`
-            if counter == chunksize:
-                yield chunk
-
-                # Empty list, reset counter
-                chunk = []
-                counter = 0
+    with open_file(filename, mode, compression) as (_, file_handle, is_binary):
+        line_batches = iter_line_batches(_binary(file_handle, is_binary), True)
+        if prefetch:
+            line_batches = iter_in_background(line_batches)
 
-        # If `chunk` contains items after all lines have been read, yield it
-        if counter > 0:
-            yield chunk
+        yield from iter_chunks((map(loads, lines) for lines in line_batches), chunksize)
 
 
 def read_jsonl(
@@ -169,6 +416,8 @@ def read_jsonl(
     mode: str = "r",
     compression: Optional[str] = "infer",
     chunksize: Optional[int] = None,
+    prefetch: bool = False,
+    schema: Optional[Any] = None,
 ) -> Union[List[Any], Generator[List[Any], None, None]]:
     """
     Read JSON Lines file.
@@ -177,16 +426,24 @@ def read_jsonl(
         filename (Union[str, Path]): Path to file.
         mode (str, optional): File access mode. Must start with 'r'. Defaults to 'r'.
         compression (Optional[str], optional): File compression method. Options: 'bz2',
-            'gzip', 'tar', 'xz', 'zip', 'zstd', None (no compression), or 'infer'. Use
-            'infer' for automatic detection based on file extension. For tar archives,
-            use 'infer' with appropriate file extensions ('.tar.bz2', '.tar.gz', '.tgz',
-            '.tar.xz') or use 'tar' with `mode` set to 'r:bz2', 'r:gz', or 'r:xz'.
-            Defaults to 'infer'.
+            'gzip', 'lz4', 'tar', 'xz', 'zip', 'zstd', None (no compression), or
+            'infer'. Use 'infer' for automatic detection based on file extension. For
+            tar archives, use 'infer' with appropriate file extensions ('.tar.bz2',
+            '.tar.gz', '.tgz', '.tar.xz') or use 'tar' with `mode` set to 'r:bz2',
+            'r:gz', or 'r:xz'. Defaults to 'infer'.
         chunksize (Optional[int], optional): If None, reads all JSON-serializable
             objects (= lines) at once. If integer, reads the file in chunks of
             `chunksize`. Defaults to None.
+        prefetch (bool, optional): If True, read and decompress the file in a
+            background thread while parsing. This speeds up reading compressed files
+            on multi-core machines. Defaults to False.
+        schema (Optional[Any], optional): If not None, decode into instances of this
+            type (e.g. a subclass of `msgspec.Struct`) with msgspec, which also
+            validates the data. Requires package 'msgspec'. Defaults to None.
 
     Raises:
+        ModuleNotFoundError: If `schema` is not None and package 'msgspec' is not
+            installed.
         ValueError: If `mode` does not start with 'r'.
         ValueError: If `chunksize` is not None and less than 1.
 
@@ -194,22 +451,111 @@ def read_jsonl(
         Union[List[Any], Generator[List[Any], None, None]]: If `chunksize` is None,
             returns a list of JSON-serializable objects. If `chunksize` is an integer,
             returns a generator that yields lists of JSON-serializable objects in chunks
-            of `chunksize`.
+            of `chunksize`. If `schema` is not None, objects are instances of `schema`.
     """
     # Check mode
-    if not mode.startswith("r"):
+    if mode[:1] != "r":
         raise ValueError("Unrecognized mode: %s\nValid modes start with: r" % mode)
 
-    if chunksize is None:
+    if chunksize is None and prefetch:
+        loads = _get_loads(schema)
+        data: List[Any] = []
+        blank_lines: List[bytes] = []
+
         with open_file(filename, mode, compression) as (_, file_handle, is_binary):
-            content = file_handle.read()
+            line_batches = iter_line_batches(_binary(file_handle, is_binary), True)
+
+            # Closing stops the background thread, also if parsing fails
+            with closing(iter_in_background(line_batches)) as prefetched:
+                for lines in prefetched:
+                    # Hold back empty lines at the end of the batch, as those at the
+                    # end of the file are dropped (like below)
+                    end = len(lines)
+                    while end and not lines[end - 1]:
+                        end -= 1
+
+                    if end:
+                        data.extend(map(loads, blank_lines))
+                        data.extend(map(loads, islice(lines, end)))
+                        blank_lines.clear()
+
+                    blank_lines.extend(islice(lines, end, None))
+
+        return data
+
+    if chunksize is None:
+        loads = _get_loads(schema)
+
+        # Large, uncompressed files are split as bytes, without decoding them first
+        with map_file(filename, mode, compression) as mapped:
+            if mapped is not None:
+                lines = mapped[:].split(b"\n")
 
-            if is_binary:
-                content = content.decode()
+        if mapped is None:
+            with open_file(filename, mode, compression) as (_, file_handle, is_binary):
+                lines = _binary(file_handle, is_binary).read().split(b"\n")
 
-            return [json.loads(line) for line in content.rstrip("\n").split("\n")]
+        # Drop empty lines at the end of the file (without copying the content)
+        while lines and not lines[-1]:
+            lines.pop()
 
-    return _read_jsonl_generator(filename, mode, compression, chunksize)
+        return list(map(loads, lines))
+
+    return _read_jsonl_generator(
+        filename, mode, compression, chunksize, prefetch, schema
+    )
+
+
+def read_jsonl_many(
+    filenames: Iterable[Union[str, Path]],
+    mode: str = "r",
+    compression: Optional[str] = "infer",
+    schema: Optional[Any] = None,
+    workers: Optional[int] = None,
+    threads: bool = False,
+) -> List[List[Any]]:
+    """
+    Read multiple JSONL files (e.g. shards of a dataset) in parallel.
+
+    Args:
+        filenames (Iterable[Union[str, Path]]): Paths to files.
+        mode (str, optional): File access mode. Must start with 'r'. Defaults to 'r'.
+        compression (Optional[str], optional): File compression method, see
+            `read_jsonl()`. Applies to all files. Defaults to 'infer'.
+        schema (Optional[Any], optional): Type to decode into, see `read_jsonl()`. Must
+            be picklable if `threads` is False. Defaults to None.
+        workers (Optional[int], optional): Maximum number of files read at the same
+            time. If None, uses the default of `concurrent.futures`. Defaults to None.
+        threads (bool, optional): If True, read files in threads instead of processes.
+            Threads avoid the cost of starting processes and of sending the results
+            back, which pays off for small files. Defaults to False.
+
+    Raises:
+        ModuleNotFoundError: If `schema` is not None and package 'msgspec' is not
+            installed.
+        ValueError: If `mode` does not start with 'r'.
+
+    Returns:
+        List[List[Any]]: For each file (in the order of `filenames`), a list of
+            JSON-serializable objects.
+
+    Note:
+        Processes are not limited by the Global Interpreter Lock, hence they scale with
+        the number of cores when parsing dominates. If processes are used, call this
+        function from within an `if __name__ == "__main__":` block on platforms that
+        start processes by spawning (Windows, macOS).
+    """
+    # Check mode
+    if mode[:1] != "r":
+        raise ValueError("Unrecognized mode: %s\nValid modes start with: r" % mode)
+
+    reader = functools.partial(
+        read_jsonl, mode=mode, compression=compression, schema=schema
+    )
+
+    executor_class = ThreadPoolExecutor if threads else ProcessPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        return list(executor.map(reader, filenames))
 
 
 def write_jsonl(
@@ -218,6 +564,8 @@ def write_jsonl(
     mode: str = "w",
     compression: Optional[str] = "infer",
     level: Optional[int] = None,
+    write_buffer_size: int = 1 << 20,
+    workers: Optional[int] = None,
 ) -> None:
     """
     Write JSON-serializable object(s) to a JSON Lines file.
@@ -229,43 +577,60 @@ def write_jsonl(
         mode (str, optional): File access mode. Must start with 'w', 'x', or 'a'.
             Defaults to 'w'.
         compression (Optional[str], optional): File compression method. Options: 'bz2',
-            'gzip', 'tar', 'xz', 'zip', 'zstd', None (no compression), or 'infer'. Use
-            'infer' for automatic detection based on file extension. For tar archives,
-            use 'infer' with appropriate file extensions ('.tar.bz2', '.tar.gz', '.tgz',
-            '.tar.xz') or use 'tar' with `mode` ending in ':bz2', ':gz', or ':xz'.
-            Defaults to 'infer'.
+            'gzip', 'lz4', 'tar', 'xz', 'zip', 'zstd', None (no compression), or
+            'infer'. Use 'infer' for automatic detection based on file extension. For
+            tar archives, use 'infer' with appropriate file extensions ('.tar.bz2',
+            '.tar.gz', '.tgz', '.tar.xz') or use 'tar' with `mode` ending in ':bz2',
+            ':gz', or ':xz'. Defaults to 'infer'.
         level (Optional[int], optional): Compression level. Only used if `compression`
             is not None. Valid values depend on the compression method, typically
-            ranging from 0 (no compression) to 9 (highest compression). If None, the
-            default level for each compression method is used. Defaults to None.
+            ranging from 0 (no compression) to 9 (highest compression). If None, a
+            default favoring speed is used: 6 for 'gzip', 3 for 'xz' and 'zstd', 9 for
+            'bz2'. Defaults to None.
+        write_buffer_size (int, optional): Size in bytes of the write buffers in front
+            of the file and the compressor. Defaults to 1 MiB.
+        workers (Optional[int], optional): Number of threads compressing in parallel,
+            for 'gzip' (requires package 'zlib-ng') and 'zstd'. Use -1 for all CPUs. If
+            None, a single thread compresses in the calling thread. Defaults to None.
 
     Raises:
         ValueError: If `mode` does not start with 'w', 'x', or 'a'.
+
+    Note:
+        Each object is serialized compactly (without whitespace, e.g. '{"A":1}') and
+        written as UTF-8, with non-ASCII characters unescaped, regardless of the
+        locale or the installed JSON backend. Non-finite floats are written as NaN,
+        Infinity and -Infinity, like json does.
     """
     # Check mode
-    valid_modes = ("w", "x", "a")
-    if not mode.startswith(valid_modes):
+    if mode[:1] not in _JSONL_WRITE_MODES:
         raise ValueError(
-            "Unrecognized mode: %s\nValid modes start with: %s" % (mode, valid_modes)
+            "Unrecognized mode: %s\nValid modes start with: %s"
+            % (mode, _JSONL_WRITE_MODES)
         )
 
-    with open_file(filename, mode, compression, level) as (
+    with open_file(filename, mode, compression, level, write_buffer_size, workers) as (
         container_handle,
         file_handle,
         is_binary,
     ):
-        if isinstance(data, list):
-            data_serialized = [json.dumps(item) for item in data]
-        else:
-            data_serialized = [json.dumps(data)]
-        content = "\n".join(data_serialized) + "\n"
-
-        if is_binary:
-            content = content.encode()
+        items = data if isinstance(data, list) else [data]
 
-        # Write out
         if isinstance(file_handle, tarfile.TarInfo):
+            # Size of tar member must be known upfront, hence serialize all items
+            content = b"".join(map(_dumps_line, items))
             file_handle.size = len(content)
             container_handle.addfile(file_handle, fileobj=BytesIO(content))
         else:
-            file_handle.write(content)
+            # Write serialized items in batches, as they are produced
+            file_handle = _binary(file_handle, is_binary)
+            content = bytearray()
+            for item in items:
+                content += _dumps_line(item)
+
+                if len(content) >= _WRITE_BATCH_SIZE:
+                    file_handle.write(bytes(content))
+                    content.clear()
+
+            if content:
+                file_handle.write(bytes(content))
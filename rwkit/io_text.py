@@ -2,18 +2,33 @@
 Text file I/O
 """
 
+import codecs
+import io
+import locale
 import tarfile
 from io import BytesIO
+from itertools import repeat
 from pathlib import Path
-from typing import Any, Generator, Iterator, List, Optional, Union
+from typing import IO, Any, Generator, Iterator, List, Optional, Union
 
-from .common import open_file
+from .common import (
+    iter_chunks,
+    iter_in_background,
+    iter_line_batches,
+    map_file,
+    open_file,
+    read_cached,
+)
+
+_WRITE_BATCH_SIZE = 1 << 12
+_WRITE_MODES = ("w", "x", "a")
 
 
 def read_text(
     filename: Union[str, Path],
     mode: str = "r",
     compression: Optional[str] = "infer",
+    cache: bool = False,
 ) -> str:
     """
     Read text file and return content as a single string.
@@ -22,11 +37,15 @@ def read_text(
         filename (Union[str, Path]): File to read.
         mode (str, optional): File access mode. Must start with 'r'. Defaults to 'r'.
         compression (Optional[str], optional): File compression method. Options: 'bz2',
-            'gzip', 'tar', 'xz', 'zip', 'zstd', None (no compression), or 'infer'. Use
-            'infer' for automatic detection based on file extension. For tar archives,
-            use 'infer' with appropriate file extensions ('.tar.bz2', '.tar.gz', '.tgz',
-            '.tar.xz') or use 'tar' with `mode` set to 'r:bz2', 'r:gz', or 'r:xz'.
-            Defaults to 'infer'.
+            'gzip', 'lz4', 'tar', 'xz', 'zip', 'zstd', None (no compression), or
+            'infer'. Use 'infer' for automatic detection based on file extension. For
+            tar archives, use 'infer' with appropriate file extensions ('.tar.bz2',
+            '.tar.gz', '.tgz', '.tar.xz') or use 'tar' with `mode` set to 'r:bz2',
+            'r:gz', or 'r:xz'. Defaults to 'infer'.
+        cache (bool, optional): If True, cache the result by path, modification time
+            and size of the file, and return the cached result while the file is
+            unchanged. The cached object is shared between calls and must not be
+            modified. Defaults to False.
 
     Raises:
         ValueError: If `mode` does not start with 'r'.
@@ -34,10 +53,25 @@ def read_text(
     Returns:
         str: Content of file.
     """
+    if cache:
+        return read_cached(read_text, filename, mode, compression)
+
     # Check mode
-    if not mode.startswith("r"):
+    if mode[:1] != "r":
         raise ValueError("Unrecognized mode: %s\nValid modes start with: 'r'" % mode)
 
+    # Large, uncompressed files are decoded directly from a memory map
+    with map_file(filename, mode, compression) as mapped:
+        if mapped is not None:
+            # Decode with the encoding open() uses in text mode, like for small files
+            content = str(mapped, locale.getpreferredencoding(False))
+
+            # Translate newlines, as done by open() in text mode
+            if "\r" in content:
+                content = content.replace("\r\n", "\n").replace("\r", "\n")
+
+            return content
+
     with open_file(filename, mode, compression) as (_, file_handle, is_binary):
         content = file_handle.read()
 
@@ -49,50 +83,72 @@ def read_text(
 
 def write_text(
     filename: Union[str, Path],
-    text: str,
+    text: Union[str, bytes],
     mode: str = "w",
     compression: Optional[str] = "infer",
     level: Optional[int] = None,
+    write_buffer_size: int = 1 << 20,
+    workers: Optional[int] = None,
 ) -> None:
     """
     Write text to a file.
 
     Args:
         filename (Union[str, Path]): File to write to.
-        text (str): String to write.
+        text (Union[str, bytes]): String to write. Bytes must be UTF-8 encoded text.
+            Both are written with the same encoding: UTF-8 for compressed files, the
+            locale encoding (as used by open() and `read_text()`) for uncompressed
+            files. Bytes are written as is if that encoding is UTF-8, without decoding
+            and encoding them again.
         mode (str, optional): File access mode. Must start with 'w', 'x', or 'a'.
             Defaults to 'w'.
         compression (Optional[str], optional): File compression method. Options: 'bz2',
-            'gzip', 'tar', 'xz', 'zip', 'zstd', None (no compression), or 'infer'. Use
-            'infer' for automatic detection based on file extension. For tar archives,
-            use 'infer' with appropriate file extensions ('.tar.bz2', '.tar.gz', '.tgz',
-            '.tar.xz') or use 'tar' with `mode` ending in ':bz2', ':gz', or ':xz'.
-            Defaults to 'infer'.
+            'gzip', 'lz4', 'tar', 'xz', 'zip', 'zstd', None (no compression), or
+            'infer'. Use 'infer' for automatic detection based on file extension. For
+            tar archives, use 'infer' with appropriate file extensions ('.tar.bz2',
+            '.tar.gz', '.tgz', '.tar.xz') or use 'tar' with `mode` ending in ':bz2',
+            ':gz', or ':xz'. Defaults to 'infer'.
         level (Optional[int], optional): Compression level. Only used if `compression`
             is not None. Valid values depend on the compression method, typically
-            ranging from 0 (no compression) to 9 (highest compression). If None, the
-            default level for each compression method is used. Defaults to None.
+            ranging from 0 (no compression) to 9 (highest compression). If None, a
+            default favoring speed is used: 6 for 'gzip', 3 for 'xz' and 'zstd', 9 for
+            'bz2'. Defaults to None.
+        write_buffer_size (int, optional): Size in bytes of the write buffers in front
+            of the file and the compressor. Defaults to 1 MiB.
+        workers (Optional[int], optional): Number of threads compressing in parallel,
+            for 'gzip' (requires package 'zlib-ng') and 'zstd'. Use -1 for all CPUs. If
+            None, a single thread compresses in the calling thread. Defaults to None.
 
     Raises:
-        TypeError: If `text` is not a string.
+        TypeError: If `text` is not a string or bytes.
         ValueError: If `mode` does not start with 'w', 'x', or 'a'.
     """
     # Checks
-    if not isinstance(text, str):
-        raise TypeError("text must be a string. Use write_lines() for list of strings.")
+    if not isinstance(text, (str, bytes)):
+        raise TypeError(
+            "text must be a string or bytes. Use write_lines() for list of strings."
+        )
 
-    valid_modes = ("w", "x", "a")
-    if not mode.startswith(valid_modes):
+    if mode[:1] not in _WRITE_MODES:
         raise ValueError(
-            f"Unrecognized mode: {mode}\nValid modes start with: {valid_modes}"
+            f"Unrecognized mode: {mode}\nValid modes start with: {_WRITE_MODES}"
         )
 
-    with open_file(filename, mode, compression, level) as (
+    with open_file(filename, mode, compression, level, write_buffer_size, workers) as (
         container_handle,
         file_handle,
         is_binary,
     ):
-        if is_binary:
+        if isinstance(text, bytes):
+            if not is_binary:
+                # Text file handles encode with the locale encoding, like str is written.
+                # If that is UTF-8, write to the underlying binary buffer as is.
+                encoding = getattr(file_handle, "encoding", "utf-8")
+                if codecs.lookup(encoding).name == "utf-8":
+                    file_handle = getattr(file_handle, "buffer", file_handle)
+                else:
+                    text = str(text, "utf-8")
+        elif is_binary:
             text = text.encode()
 
         if isinstance(file_handle, tarfile.TarInfo):
@@ -102,11 +158,26 @@ def write_text(
             file_handle.write(text)
 
 
+def _decoded(file_handle: IO[bytes]) -> io.TextIOWrapper:
+    """
+    Wrap a binary file handle to decode whole blocks at once, instead of each line.
+
+    Args:
+        file_handle (IO[bytes]): Binary file handle opened for reading.
+
+    Returns:
+        io.TextIOWrapper: Text file handle. Newlines are not translated, as for binary
+            file handles.
+    """
+    return io.TextIOWrapper(file_handle, encoding="utf-8", newline="")
+
+
 def _read_lines_generator(
     filename: Union[str, Path],
     mode: str = "r",
     compression: Optional[str] = "infer",
     chunksize: int = 1,
+    prefetch: bool = False,
 ) -> Generator[List[str], Any, None]:
     """
     Generator function for reading a text file line-by-line in chunks.
@@ -115,12 +186,14 @@ def _read_lines_generator(
         filename (Union[str, Path]): File to read.
         mode (str, optional): File access mode. Must start with 'r'. Defaults to 'r'.
         compression (Optional[str], optional): File compression method. Options: 'bz2',
-            'gzip', 'tar', 'xz', 'zip', 'zstd', None (no compression), or 'infer'. Use
-            'infer' for automatic detection based on file extension. For tar archives,
-            use 'infer' with appropriate file extensions ('.tar.bz2', '.tar.gz', '.tgz',
-            '.tar.xz') or use 'tar' with `mode` set to 'r:bz2', 'r:gz', or 'r:xz'.
-            Defaults to 'infer'.
+            'gzip', 'lz4', 'tar', 'xz', 'zip', 'zstd', None (no compression), or
+            'infer'. Use 'infer' for automatic detection based on file extension. For
+            tar archives, use 'infer' with appropriate file extensions ('.tar.bz2',
+            '.tar.gz', '.tgz', '.tar.xz') or use 'tar' with `mode` set to 'r:bz2',
+            'r:gz', or 'r:xz'. Defaults to 'infer'.
         chunksize (int, optional): The number of lines to read at once. Defaults to 1.
+        prefetch (bool, optional): If True, read (decompress and decode) the file in a
+            background thread while lines are consumed. Defaults to False.
 
     Raises:
         ValueError: If `mode` does not start with 'r'.
@@ -130,33 +203,60 @@ def _read_lines_generator(
         Generator[List[str], Any, None]: A list of lines from the file.
     """
     # Checks
-    if not mode.startswith("r"):
+    if mode[:1] != "r":
         raise ValueError("Unrecognized mode: %s\nValid modes start with: 'r'" % mode)
 
     if not (chunksize >= 1):
         raise ValueError("chunksize must be 1 or greater")
 
     with open_file(filename, mode, compression) as (_, file_handle, is_binary):
-        chunk: List[str] = []
-        counter = 0
-        for line in file_handle:
-            if is_binary:
-                line = line.decode()
+        if is_binary:
+            file_handle = _decoded(file_handle)
+
+        line_batches = iter_line_batches(file_handle, False)
+        if prefetch:
+            line_batches = iter_in_background(line_batches)
+
+        yield from iter_chunks(line_batches, chunksize)
+
+
+def _iter_lines(
+    filename: Union[str, Path],
+    mode: str = "r",
+    compression: Optional[str] = "infer",
+    prefetch: bool = False,
+) -> Generator[str, Any, None]:
+    """
+    Generator function for reading a text file line-by-line.
+
+    Args:
+        filename (Union[str, Path]): File to read.
+        mode (str, optional): File access mode. Must start with 'r'. Defaults to 'r'.
+        compression (Optional[str], optional): File compression method. See
+            `read_lines()`. Defaults to 'infer'.
+        prefetch (bool, optional): If True, read (decompress and decode) the file in a
+            background thread while lines are consumed. Defaults to False.
+
+    Raises:
+        ValueError: If `mode` does not start with 'r'.
 
-            chunk.append(line.rstrip("\n"))
-            counter += 1
+    Yields:
+        Generator[str, Any, None]: A line from the file.
+    """
+    # Checks
+    if mode[:1] != "r":
+        raise ValueError("Unrecognized mode: %s\nValid modes start with: 'r'" % mode)
 
-            # Once `chunksize` is reached, yield `chunk`
-            if counter == chunksize:
-                yield chunk
+    with open_file(filename, mode, compression) as (_, file_handle, is_binary):
+        if is_binary:
+            file_handle = _decoded(file_handle)
 
-                # Empty list, reset counter
-                chunk = []
-                counter = 0
+        line_batches = iter_line_batches(file_handle, False)
+        if prefetch:
+            line_batches = iter_in_background(line_batches)
 
-        # If `chunk` contains items after all lines have been read, yield it
-        if counter > 0:
-            yield chunk
+        for lines in line_batches:
+            yield from lines
 
 
 def read_lines(
@@ -164,7 +264,9 @@ def read_lines(
     mode: str = "r",
     compression: Optional[str] = "infer",
     chunksize: Optional[int] = None,
-) -> Union[List[str], Iterator[List[str]]]:
+    stream: bool = False,
+    prefetch: bool = False,
+) -> Union[List[str], Iterator[str], Iterator[List[str]]]:
     """
     Read text file and return lines as list of strings.
 
@@ -172,23 +274,59 @@ def read_lines(
         filename (Union[str, Path]): File to read.
         mode (str, optional): File access mode. Must start with 'r'. Defaults to 'r'.
         compression (Optional[str], optional): File compression method. Options: 'bz2',
-            'gzip', 'tar', 'xz', 'zip', 'zstd', None (no compression), or 'infer'. Use
-            'infer' for automatic detection based on file extension. For tar archives,
-            use 'infer' with appropriate file extensions ('.tar.bz2', '.tar.gz', '.tgz',
-            '.tar.xz') or use 'tar' with `mode` set to 'r:bz2', 'r:gz', or 'r:xz'.
-            Defaults to 'infer'.
+            'gzip', 'lz4', 'tar', 'xz', 'zip', 'zstd', None (no compression), or
+            'infer'. Use 'infer' for automatic detection based on file extension. For
+            tar archives, use 'infer' with appropriate file extensions ('.tar.bz2',
+            '.tar.gz', '.tgz', '.tar.xz') or use 'tar' with `mode` set to 'r:bz2',
+            'r:gz', or 'r:xz'. Defaults to 'infer'.
         chunksize (Optional[int], optional): If None, reads all lines at once. If
             integer, reads the file in chunks of `chunksize` lines. Defaults to None.
+        stream (bool, optional): If True and `chunksize` is None, returns an iterator
+            that yields one line at a time, instead of reading all lines into memory.
+            Defaults to False.
+        prefetch (bool, optional): If True and `chunksize` is not None or `stream` is
+            True, read (decompress and decode) the file in a background thread while
+            lines are consumed. This overlaps I/O with processing the lines. Defaults
+            to False.
 
     Returns:
-        Union[List[str], Iterator[List[str]]]: If `chunksize` is None, returns a list of
-            strings. If `chunksize` is an integer, returns an iterator that yields lists
-            of strings in chunks of `chunksize`.
+        Union[List[str], Iterator[str], Iterator[List[str]]]: If `chunksize` is None,
+            returns a list of strings, or an iterator of strings if `stream` is True.
+            If `chunksize` is an integer, returns an iterator that yields lists of
+            strings in chunks of `chunksize`.
     """
+    if chunksize is None and stream:
+        return _iter_lines(filename, mode, compression, prefetch)
+
     if chunksize is None:
-        return read_text(filename, mode, compression).rstrip("\n").split("\n")
+        lines = read_text(filename, mode, compression).split("\n")
+
+        # Drop empty lines at the end of the file (without copying the content), but
+        # keep one for an empty file
+        while len(lines) > 1 and not lines[-1]:
+            lines.pop()
+
+        return lines
+
+    return _read_lines_generator(filename, mode, compression, chunksize, prefetch)
+
+
+def _write_lines_batched(
+    file_handle: IO, lines: List[str], is_binary: bool, size: int = _WRITE_BATCH_SIZE
+) -> None:
+    """
+    Write lines in batches, without joining all lines into a single string.
 
-    return _read_lines_generator(filename, mode, compression, chunksize)
+    Args:
+        file_handle (IO): File handle to write to.
+        lines (List[str]): Lines to write. A newline character is added after each line.
+        is_binary (bool): Whether `file_handle` expects bytes.
+        size (int, optional): Number of lines per batch. Defaults to 4096.
+    """
+    # An empty list still writes a single newline character
+    for start in range(0, max(len(lines), 1), size):
+        content = "\n".join(lines[start : start + size]) + "\n"
+        file_handle.write(content.encode() if is_binary else content)
 
 
 def write_lines(
@@ -197,6 +335,8 @@ def write_lines(
     mode: str = "w",
     compression: Optional[str] = "infer",
     level: Optional[int] = None,
+    write_buffer_size: int = 1 << 20,
+    workers: Optional[int] = None,
 ) -> None:
     """
     Write string or list of strings to a file with trailing newlines.
@@ -207,19 +347,26 @@ def write_lines(
         mode (str, optional): File access mode. Must start with 'w', 'x', or 'a'.
             Defaults to 'w'.
         compression (Optional[str], optional): File compression method. Options: 'bz2',
-            'gzip', 'tar', 'xz', 'zip', 'zstd', None (no compression), or 'infer'. Use
-            'infer' for automatic detection based on file extension. For tar archives,
-            use 'infer' with appropriate file extensions ('.tar.bz2', '.tar.gz', '.tgz',
-            '.tar.xz') or use 'tar' with `mode` ending in ':bz2', ':gz', or ':xz'.
-            Defaults to 'infer'.
+            'gzip', 'lz4', 'tar', 'xz', 'zip', 'zstd', None (no compression), or
+            'infer'. Use 'infer' for automatic detection based on file extension. For
+            tar archives, use 'infer' with appropriate file extensions ('.tar.bz2',
+            '.tar.gz', '.tgz', '.tar.xz') or use 'tar' with `mode` ending in ':bz2',
+            ':gz', or ':xz'. Defaults to 'infer'.
         level (Optional[int], optional): Compression level. Only used if `compression`
             is not None. Valid values depend on the compression method, typically
-            ranging from 0 (no compression) to 9 (highest compression). If None, the
-            default level for each compression method is used. Defaults to None.
+            ranging from 0 (no compression) to 9 (highest compression). If None, a
+            default favoring speed is used: 6 for 'gzip', 3 for 'xz' and 'zstd', 9 for
+            'bz2'. Defaults to None.
+        write_buffer_size (int, optional): Size in bytes of the write buffers in front
+            of the file and the compressor. Defaults to 1 MiB.
+        workers (Optional[int], optional): Number of threads compressing in parallel,
+            for 'gzip' (requires package 'zlib-ng') and 'zstd'. Use -1 for all CPUs. If
+            None, a single thread compresses in the calling thread. Defaults to None.
 
     Raises:
         TypeError: If `lines` is not a string or list of strings.
         TypeError: If `lines` is a list with non-string elements.
+        ValueError: If `mode` does not start with 'w', 'x', or 'a'.
 
     Note:
         A newline character is added after each line and at the end of the file.
@@ -228,10 +375,11 @@ def write_lines(
     if isinstance(lines, str):
         lines = [lines]
     elif isinstance(lines, list):
-        non_string_elements = set(
-            [type(t).__name__ for t in lines if not isinstance(t, str)]
-        )
-        if non_string_elements:
+        # Check all elements at C level, only collect type names on failure
+        if not all(map(isinstance, lines, repeat(str))):
+            non_string_elements = set(
+                [type(t).__name__ for t in lines if not isinstance(t, str)]
+            )
             raise TypeError(
                 "lines must be a string or list of strings, got list with %s"
                 % ", ".join(non_string_elements)
@@ -241,5 +389,19 @@ def write_lines(
             "lines must be a string or list of strings, got %s" % type(lines).__name__
         )
 
-    content = "\n".join(lines) + "\n"
-    write_text(filename, content, mode, compression, level)
+    if mode[:1] not in _WRITE_MODES:
+        raise ValueError(
+            f"Unrecognized mode: {mode}\nValid modes start with: {_WRITE_MODES}"
+        )
+
+    with open_file(filename, mode, compression, level, write_buffer_size, workers) as (
+        container_handle,
+        file_handle,
+        is_binary,
+    ):
+        if isinstance(file_handle, tarfile.TarInfo):
+            content = ("\n".join(lines) + "\n").encode()
+            file_handle.size = len(content)
+            container_handle.addfile(file_handle, fileobj=BytesIO(content))
+        else:
+            _write_lines_batched(file_handle, lines, is_binary)
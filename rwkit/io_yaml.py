@@ -2,25 +2,160 @@
 YAML file I/O
 """
 
+import os
+import pickle
+import stat
+import struct
 import tarfile
 from io import BytesIO
 from pathlib import Path
+from types import ModuleType
 from typing import Any, Optional, Union
 
-from .common import open_file
+from .common import open_file, read_cached
 
-try:
-    import yaml
+_WRITE_MODES = ("w", "x")
 
-    _HAVE_YAML = True
-except ImportError:
-    _HAVE_YAML = False
+# Header of sidecar cache files: modification time (ns) and size of the source file
+_SIDECAR_HEADER = struct.Struct("<qq")
+_SIDECAR_SUFFIX = ".cache.pickle"
+_MISSING = object()
+
+# Classes that sidecar cache files may contain, besides builtin containers and scalars:
+# those constructed by the safe YAML loader (timestamps)
+_SIDECAR_CLASSES = {
+    ("datetime", "date"),
+    ("datetime", "datetime"),
+    ("datetime", "timedelta"),
+    ("datetime", "timezone"),
+}
+
+# Optional dependency, imported on first use
+_yaml: Optional[ModuleType] = None
+_Loader: Any = None
+_Dumper: Any = None
+
+
+def _import_yaml() -> ModuleType:
+    """
+    Import module 'yaml' on first use.
+
+    Raises:
+        ModuleNotFoundError: If package 'pyyaml' is not installed.
+
+    Returns:
+        ModuleType: Module 'yaml'.
+    """
+    global _yaml, _Loader, _Dumper
+
+    if _yaml is None:
+        try:
+            import yaml
+        except ImportError:
+            raise ModuleNotFoundError(
+                "No module named 'yaml'. Install with: $ pip install pyyaml"
+            ) from None
+
+        # Prefer the C implementations (libyaml), if available
+        _Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        _Dumper = getattr(yaml, "CDumper", yaml.Dumper)
+        _yaml = yaml
+
+    return _yaml
+
+
+class _SidecarUnpickler(pickle.Unpickler):
+    """
+    Unpickler restricted to the types produced by the safe YAML loader, such that
+    loading a sidecar file cannot execute code.
+    """
+
+    def find_class(self, module: str, name: str) -> Any:
+        if (module, name) not in _SIDECAR_CLASSES:
+            raise pickle.UnpicklingError("Forbidden class: %s.%s" % (module, name))
+
+        return super().find_class(module, name)
+
+
+def _is_trusted(file_handle: Any) -> bool:
+    """
+    Check that a file is owned by the current user and not writable by others.
+
+    Args:
+        file_handle (Any): Open file handle.
+
+    Returns:
+        bool: True if the file is trusted. Always True where file ownership is not
+            available (e.g. Windows).
+    """
+    if not hasattr(os, "getuid"):
+        return True
+
+    stat_result = os.fstat(file_handle.fileno())
+
+    return stat_result.st_uid == os.getuid() and not (
+        stat_result.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+
+
+def _read_sidecar(sidecar: str, header: bytes) -> Any:
+    """
+    Load the object cached in a sidecar file, if it belongs to the current source file.
+
+    Args:
+        sidecar (str): Sidecar cache file.
+        header (bytes): Expected header, see `_SIDECAR_HEADER`.
+
+    Returns:
+        Any: Cached object, or `_MISSING` if the sidecar file does not exist, is
+            outdated, cannot be read, or is not trusted (see `_is_trusted()`).
+    """
+    try:
+        with open(sidecar, mode="rb") as file_handle:
+            if not _is_trusted(file_handle):
+                return _MISSING
+
+            if file_handle.read(_SIDECAR_HEADER.size) != header:
+                return _MISSING
+
+            return _SidecarUnpickler(file_handle).load()
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return _MISSING
+
+
+def _write_sidecar(sidecar: str, header: bytes, data: Any) -> None:
+    """
+    Cache an object in a sidecar file. Errors are ignored, as the cache is optional.
+
+    Args:
+        sidecar (str): Sidecar cache file.
+        header (bytes): Header identifying the source file, see `_SIDECAR_HEADER`.
+        data (Any): Object to cache.
+    """
+    # Write to a temporary file first, such that readers never see a partial file. The
+    # file must not exist yet (no symlinks followed) and is not writable by others.
+    tmp_sidecar = "%s.%d.tmp" % (sidecar, os.getpid())
+    try:
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+        fd = os.open(tmp_sidecar, flags, 0o644)
+        with open(fd, mode="wb") as file_handle:
+            file_handle.write(header)
+            pickle.dump(data, file_handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(tmp_sidecar, sidecar)
+    except (OSError, pickle.PicklingError):
+        try:
+            os.remove(tmp_sidecar)
+        except OSError:
+            pass
 
 
 def read_yaml(
     filename: Union[str, Path],
     mode: str = "r",
     compression: Optional[str] = "infer",
+    cache: bool = False,
+    cache_sidecar: bool = False,
 ) -> Any:
     """
     Read a YAML file.
@@ -29,11 +164,19 @@ def read_yaml(
         filename (Union[str, Path]): File to read.
         mode (str, optional): File access mode. Must start with 'r'. Defaults to 'r'.
         compression (Optional[str], optional): File compression method. Options: 'bz2',
-            'gzip', 'tar', 'xz', 'zip', 'zstd', None (no compression), or 'infer'. Use
-            'infer' for automatic detection based on file extension. For tar archives,
-            use 'infer' with appropriate file extensions ('.tar.bz2', '.tar.gz', '.tgz',
-            '.tar.xz') or use 'tar' with `mode` set to 'r:bz2', 'r:gz', or 'r:xz'.
-            Defaults to 'infer'.
+            'gzip', 'lz4', 'tar', 'xz', 'zip', 'zstd', None (no compression), or
+            'infer'. Use 'infer' for automatic detection based on file extension. For
+            tar archives, use 'infer' with appropriate file extensions ('.tar.bz2',
+            '.tar.gz', '.tgz', '.tar.xz') or use 'tar' with `mode` set to 'r:bz2',
+            'r:gz', or 'r:xz'. Defaults to 'infer'.
+        cache (bool, optional): If True, cache the result by path, modification time
+            and size of the file, and return the cached result while the file is
+            unchanged. The cached object is shared between calls and must not be
+            modified. Defaults to False.
+        cache_sidecar (bool, optional): If True, cache the result in a file next to
+            `filename` (with suffix '.cache.pickle'), and load it instead of parsing
+            `filename` while its modification time and size are unchanged. Unlike
+            `cache`, this persists across processes. Defaults to False.
 
     Raises:
         ModuleNotFoundError: If package 'pyyaml' is not installed.
@@ -43,25 +186,44 @@ def read_yaml(
         Any: The parsed YAML content as a Python object.
 
     Note:
-        This function uses yaml.safe_load() internally, which may raise yaml.YAMLError
-        if there's an issue parsing the YAML content.
+        This function uses yaml.load() with a safe loader internally (libyaml-based
+        CSafeLoader if available), which may raise yaml.YAMLError if there's an issue
+        parsing the YAML content.
+
+        Sidecar cache files are only loaded if owned by the current user and not
+        writable by others, and may only contain the types the safe loader produces.
     """
-    if not _HAVE_YAML:
-        raise ModuleNotFoundError(
-            "No module named 'yaml'. Install with: $ pip install pyyaml"
-        )
+    yaml = _import_yaml()
+
+    if cache:
+        return read_cached(read_yaml, filename, mode, compression, False, cache_sidecar)
 
     # Check mode
-    if not mode.startswith("r"):
+    if mode[:1] != "r":
         raise ValueError("Unrecognized mode: %s\nValid modes start with: r" % mode)
 
-    with open_file(filename, mode, compression) as (_, file_handle, is_content_binary):
-        content = file_handle.read()
+    if cache_sidecar:
+        try:
+            stat_result: Optional[os.stat_result] = os.stat(filename)
+        except OSError:
+            # Let open_file() raise its usual error below
+            stat_result = None
+
+        if stat_result is not None:
+            sidecar = os.fspath(filename) + _SIDECAR_SUFFIX
+            header = _SIDECAR_HEADER.pack(stat_result.st_mtime_ns, stat_result.st_size)
+
+            data = _read_sidecar(sidecar, header)
+            if data is _MISSING:
+                data = read_yaml(filename, mode, compression)
+                _write_sidecar(sidecar, header, data)
 
-        if is_content_binary:
-            content = content.decode()
+            return data
 
-        return yaml.safe_load(content)
+    with open_file(filename, mode, compression) as (_, file_handle, _):
+        # Parse from the file handle, instead of reading (and decoding) all content
+        # upfront. The loader detects the encoding of binary file handles.
+        return yaml.load(file_handle, Loader=_Loader)
 
 
 def write_yaml(
@@ -70,6 +232,8 @@ def write_yaml(
     mode: str = "w",
     compression: Optional[str] = "infer",
     level: Optional[int] = None,
+    write_buffer_size: int = 1 << 20,
+    workers: Optional[int] = None,
 ) -> None:
     """
     Write a YAML-serializable object to a YAML file.
@@ -80,15 +244,21 @@ def write_yaml(
         mode (str, optional): File access mode. Must start with 'w' or 'x'. Defaults to
             'w'.
         compression (Optional[str], optional): File compression method. Options: 'bz2',
-            'gzip', 'tar', 'xz', 'zip', 'zstd', None (no compression), or 'infer'. Use
-            'infer' for automatic detection based on file extension. For tar archives,
-            use 'infer' with appropriate file extensions ('.tar.bz2', '.tar.gz', '.tgz',
-            '.tar.xz') or use 'tar' with `mode` ending in ':bz2', ':gz', or ':xz'.
-            Defaults to 'infer'.
+            'gzip', 'lz4', 'tar', 'xz', 'zip', 'zstd', None (no compression), or
+            'infer'. Use 'infer' for automatic detection based on file extension. For
+            tar archives, use 'infer' with appropriate file extensions ('.tar.bz2',
+            '.tar.gz', '.tgz', '.tar.xz') or use 'tar' with `mode` ending in ':bz2',
+            ':gz', or ':xz'. Defaults to 'infer'.
         level (Optional[int], optional): Compression level. Only used if `compression`
             is not None. Valid values depend on the compression method, typically
-            ranging from 0 (no compression) to 9 (highest compression). If None, the
-            default level for each compression method is used. Defaults to None.
+            ranging from 0 (no compression) to 9 (highest compression). If None, a
+            default favoring speed is used: 6 for 'gzip', 3 for 'xz' and 'zstd', 9 for
+            'bz2'. Defaults to None.
+        write_buffer_size (int, optional): Size in bytes of the write buffers in front
+            of the file and the compressor. Defaults to 1 MiB.
+        workers (Optional[int], optional): Number of threads compressing in parallel,
+            for 'gzip' (requires package 'zlib-ng') and 'zstd'. Use -1 for all CPUs. If
+            None, a single thread compresses in the calling thread. Defaults to None.
 
     Raises:
         ModuleNotFoundError: If package 'pyyaml' is not installed.
@@ -98,31 +268,30 @@ def write_yaml(
         The YAML content is dumped with `sort_keys=False`, preserving the original order
         of keys in dictionaries.
     """
-    if not _HAVE_YAML:
-        raise ModuleNotFoundError(
-            "No module named 'yaml'. Install with: $ pip install pyyaml"
-        )
+    yaml = _import_yaml()
 
     # Check mode
-    valid_modes = ("w", "x")
-    if not mode.startswith(valid_modes):
+    if mode[:1] not in _WRITE_MODES:
         raise ValueError(
-            "Unrecognized mode: %s\nValid modes start with: %s" % (mode, valid_modes)
+            "Unrecognized mode: %s\nValid modes start with: %s" % (mode, _WRITE_MODES)
         )
 
-    with open_file(filename, mode, compression, level) as (
+    with open_file(filename, mode, compression, level, write_buffer_size, workers) as (
         container_handle,
         file_handle,
         is_content_binary,
     ):
-        content = yaml.dump(data, sort_keys=False)
-
-        if is_content_binary:
-            content = content.encode()
-
         # Write out
         if isinstance(file_handle, tarfile.TarInfo):
+            content = yaml.dump(data, Dumper=_Dumper, sort_keys=False).encode()
             file_handle.size = len(content)
             container_handle.addfile(file_handle, fileobj=BytesIO(content))
         else:
-            file_handle.write(content)
+            # Dump to the file handle, instead of building the whole content first
+            yaml.dump(
+                data,
+                file_handle,
+                Dumper=_Dumper,
+                sort_keys=False,
+                encoding="utf-8" if is_content_binary else None,
+            )
@@ -9,13 +9,24 @@ import lzma
 import tarfile
 import unittest
 import zipfile
-from io import BytesIO
+from io import BytesIO, StringIO
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
 import zstandard
 
-from rwkit.common import open_file
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+from rwkit.common import (
+    _infer_compression,
+    iter_chunks,
+    iter_in_background,
+    iter_line_batches,
+    open_file,
+)
 
 
 class TestCommon(unittest.TestCase):
@@ -47,14 +58,22 @@ class TestCommon(unittest.TestCase):
         content = "\n".join(txts_expected) + "\n"
         content_binary = content.encode()
 
-        for add_file_extension, mode, compression, infer, level in itertools.product(
-            add_file_extension_list,
-            mode_list,
-            compression_list,
-            infer_list,
-            level_list,
-        ):
-            with TemporaryDirectory() as tmpdir:
+        with TemporaryDirectory() as tmpdir:
+            for index, (
+                add_file_extension,
+                mode,
+                compression,
+                infer,
+                level,
+            ) in enumerate(
+                itertools.product(
+                    add_file_extension_list,
+                    mode_list,
+                    compression_list,
+                    infer_list,
+                    level_list,
+                )
+            ):
                 # Opening a directory raises IsADirectoryError
                 with self.assertRaises(IsADirectoryError):
                     with open_file(
@@ -65,7 +84,13 @@ class TestCommon(unittest.TestCase):
                     ) as _:
                         pass
 
-                filepath = Path(tmpdir) / "file"
+                if compression in ("tar.xz", "xz") and (level or 0) > 6:
+                    # xz presets 7-9 only enlarge the dictionary (up to 64 MiB), which
+                    # makes setting up each compressor ~50x slower, hence, skip these
+                    # cases
+                    continue
+
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 if compression == "?":
                     if mode == "r":
@@ -232,3 +257,219 @@ class TestCommon(unittest.TestCase):
                                 pass
                 else:
                     raise NotImplementedError(mode)
+
+    def test_open_file_not_found(self):
+        """test_open_file_not_found"""
+
+        with TemporaryDirectory() as tmpdir:
+            filepath = Path(tmpdir) / "file.txt"
+            filepath.write_text("text")
+
+            # A path below a regular file fails with NotADirectoryError in os.stat()
+            for filename in (Path(tmpdir) / "missing.txt", filepath / "file.txt"):
+                with self.assertRaises(FileNotFoundError):
+                    with open_file(filename, "r") as _:
+                        pass
+
+    def test_infer_compression(self):
+        """test_infer_compression"""
+
+        name_expected_list = [
+            ("file", (None, None)),
+            ("file.txt", (None, None)),
+            ("file.tar", ("tar", None)),
+            ("file.tar.bz2", ("tar", ":bz2")),
+            ("file.tar.gz", ("tar", ":gz")),
+            ("file.tgz", ("tar", ":gz")),
+            ("file.tar.xz", ("tar", ":xz")),
+            ("file.bz2", ("bz2", None)),
+            ("file.gz", ("gzip", None)),
+            ("file.lz4", ("lz4", None)),
+            ("file.txt.gz", ("gzip", None)),
+            ("tar.gz", ("gzip", None)),
+            ("file.xz", ("xz", None)),
+            ("file.zip", ("zip", None)),
+            ("file.zst", ("zstd", None)),
+        ]
+
+        for name, expected in name_expected_list:
+            self.assertEqual(
+                expected,
+                _infer_compression(name),
+                "_infer_compression() failed for '%s'" % name,
+            )
+
+    def test_iter_line_batches(self):
+        """test_iter_line_batches"""
+
+        content_list = [
+            "",
+            "\n",
+            "a",
+            "a\n",
+            "a\nbc",
+            "a\nbc\n",
+            "a\n\nbc\ndef\n",
+            "a long line\nanother long line without newline",
+        ]
+        size_list = [1, 2, 3, 5, 100]
+
+        for content, size, is_binary in itertools.product(
+            content_list, size_list, [True, False]
+        ):
+            lines_expected = content.split("\n")
+            if lines_expected[-1] == "":
+                lines_expected.pop()
+
+            if is_binary:
+                file_handle = BytesIO(content.encode())
+                lines_expected = [line.encode() for line in lines_expected]
+            else:
+                file_handle = StringIO(content)
+
+            lines_observed = [
+                line
+                for lines in iter_line_batches(file_handle, is_binary, size=size)
+                for line in lines
+            ]
+
+            self.assertEqual(
+                lines_expected,
+                lines_observed,
+                "iter_line_batches() failed.\n"
+                "Parameters:\n"
+                f"  content: {content!r}\n"
+                f"  size: {size}\n"
+                f"  is_binary: {is_binary}",
+            )
+
+    def test_iter_chunks(self):
+        """test_iter_chunks"""
+
+        items = list(range(20))
+        for batchsize, chunksize in itertools.product([1, 3, 20, 50], [1, 4, 20, 30]):
+            batches = (
+                items[start : start + batchsize]
+                for start in range(0, len(items), batchsize)
+            )
+            expected = [
+                items[start : start + chunksize]
+                for start in range(0, len(items), chunksize)
+            ]
+            self.assertEqual(expected, list(iter_chunks(batches, chunksize)))
+
+        self.assertEqual([], list(iter_chunks(iter([]), 2)))
+
+    def test_iter_in_background(self):
+        """test_iter_in_background"""
+
+        for n_items, size in itertools.product([0, 1, 10, 100], [1, 2, 5]):
+            self.assertEqual(
+                list(range(n_items)),
+                list(iter_in_background(iter(range(n_items)), size=size)),
+            )
+
+        # Exceptions are re-raised in the calling thread
+        def failing_iterator():
+            yield 0
+            raise KeyError("failed")
+
+        iterator = iter_in_background(failing_iterator())
+        self.assertEqual(0, next(iterator))
+        self.assertRaises(KeyError, next, iterator)
+
+        # Closing early stops the background thread
+        iterator = iter_in_background(itertools.count())
+        self.assertEqual(0, next(iterator))
+        iterator.close()
+
+    def test_open_file_write_buffer_size(self):
+        """test_open_file_write_buffer_size"""
+
+        content = b"".join(b"%d\n" % i for i in range(10000))
+
+        with TemporaryDirectory() as tmp_dir:
+            for extension in ["", ".bz2", ".gz", ".xz", ".zst"]:
+                filename = Path(tmp_dir, "test.txt" + extension)
+
+                for write_buffer_size in [16, 4096, 1 << 20]:
+                    with open_file(
+                        filename, "wb", "infer", write_buffer_size=write_buffer_size
+                    ) as (_, file_handle, _):
+                        file_handle.write(content)
+
+                    with open_file(filename, "rb", "infer") as (_, file_handle, _):
+                        self.assertEqual(content, file_handle.read())
+
+            # gzip output does not depend on the time of writing
+            filename = Path(tmp_dir, "test.txt.gz")
+            with open_file(filename, "wb", "infer") as (_, file_handle, _):
+                file_handle.write(content)
+            self.assertEqual(0, int.from_bytes(filename.read_bytes()[4:8], "little"))
+
+    def test_open_file_default_level(self):
+        """test_open_file_default_level"""
+
+        content = b"".join(b"%d\n" % i for i in range(10000))
+
+        with TemporaryDirectory() as tmp_dir:
+            # gzip header flags 2 for level 9, 0 for intermediate levels like 6
+            filename = Path(tmp_dir, "test.txt.gz")
+            for level, extra_flags in [(None, 0), (9, 2)]:
+                with open_file(filename, "wb", "infer", level) as (_, file_handle, _):
+                    file_handle.write(content)
+                self.assertEqual(extra_flags, filename.read_bytes()[8])
+
+            # Default level also applies to compressed tar archives
+            filename = Path(tmp_dir, "test.tar.gz")
+            with open_file(filename, "w", "infer") as (
+                container_handle,
+                file_handle,
+                _,
+            ):
+                file_handle.size = len(content)
+                container_handle.addfile(file_handle, fileobj=BytesIO(content))
+            self.assertEqual(0, filename.read_bytes()[8])
+
+    @unittest.skipIf(lz4 is None, "lz4 is not installed")
+    def test_open_file_lz4(self):
+        """test_open_file_lz4"""
+
+        content = b"".join(b"%d\n" % i for i in range(10000))
+
+        with TemporaryDirectory() as tmp_dir:
+            filename = Path(tmp_dir, "test.txt.lz4")
+            for compression, level in [("infer", None), ("lz4", 9)]:
+                with open_file(filename, "wb", compression, level) as (
+                    container_handle,
+                    file_handle,
+                    is_binary,
+                ):
+                    self.assertIsNone(container_handle)
+                    self.assertTrue(is_binary)
+                    file_handle.write(content)
+
+                self.assertEqual(content, lz4.frame.decompress(filename.read_bytes()))
+
+                with open_file(filename, "rb", compression) as (_, file_handle, _):
+                    self.assertEqual(content, file_handle.read())
+
+    def test_open_file_workers(self):
+        """test_open_file_workers"""
+
+        content = b"".join(b"%d\n" % i for i in range(100000))
+
+        with TemporaryDirectory() as tmp_dir:
+            for extension, workers in itertools.product(
+                [".gz", ".zst"], [None, 1, 2, -1]
+            ):
+                filename = Path(tmp_dir, "test.txt" + extension)
+                with open_file(filename, "wb", "infer", workers=workers) as (
+                    _,
+                    file_handle,
+                    _,
+                ):
+                    file_handle.write(content)
+
+                with open_file(filename, "rb", "infer") as (_, file_handle, _):
+                    self.assertEqual(content, file_handle.read())
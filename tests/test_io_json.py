@@ -7,16 +7,31 @@ import gzip
 import itertools
 import json
 import lzma
+import math
 import tarfile
 import unittest
 import zipfile
 from io import BytesIO
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from typing import List
 
 import zstandard
 
-from rwkit.io_json import read_json, read_jsonl, write_json, write_jsonl
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+from rwkit.io_json import (
+    _dumps,
+    _loads,
+    read_json,
+    read_jsonl,
+    read_jsonl_many,
+    write_json,
+    write_jsonl,
+)
 
 
 class TestJson(unittest.TestCase):
@@ -56,19 +71,21 @@ class TestJson(unittest.TestCase):
             "zstd",
         )
 
-        for (
-            data_expected,
-            add_file_extension,
-            compression,
-            infer,
-        ) in itertools.product(
-            data_expected_list,
-            add_file_extension_list,
-            compression_list,
-            infer_list,
-        ):
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+        with TemporaryDirectory() as tmpdir:
+            for index, (
+                data_expected,
+                add_file_extension,
+                compression,
+                infer,
+            ) in enumerate(
+                itertools.product(
+                    data_expected_list,
+                    add_file_extension_list,
+                    compression_list,
+                    infer_list,
+                )
+            ):
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 content = json.dumps(data_expected)
                 content_bytes = content.encode()
@@ -209,21 +226,23 @@ class TestJson(unittest.TestCase):
         infer_list = [True, False]
         modes_list = ["w", "x", "a", "?"]
 
-        for (
-            data_expected,
-            add_file_extension,
-            compression,
-            infer,
-            mode,
-        ) in itertools.product(
-            data_expected_list,
-            add_file_extension_list,
-            compression_list,
-            infer_list,
-            modes_list,
-        ):
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+        with TemporaryDirectory() as tmpdir:
+            for index, (
+                data_expected,
+                add_file_extension,
+                compression,
+                infer,
+                mode,
+            ) in enumerate(
+                itertools.product(
+                    data_expected_list,
+                    add_file_extension_list,
+                    compression_list,
+                    infer_list,
+                    modes_list,
+                )
+            ):
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 if add_file_extension:
                     if compression is None:
@@ -394,21 +413,23 @@ class TestJson(unittest.TestCase):
         infer_list = [True, False]
         modes_list = ["w", "x", "a", "?"]
 
-        for (
-            data_expected,
-            add_file_extension,
-            compression,
-            infer,
-            mode,
-        ) in itertools.product(
-            data_expected_list,
-            add_file_extension_list,
-            compression_list,
-            infer_list,
-            modes_list,
-        ):
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+        with TemporaryDirectory() as tmpdir:
+            for index, (
+                data_expected,
+                add_file_extension,
+                compression,
+                infer,
+                mode,
+            ) in enumerate(
+                itertools.product(
+                    data_expected_list,
+                    add_file_extension_list,
+                    compression_list,
+                    infer_list,
+                    modes_list,
+                )
+            ):
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 if add_file_extension:
                     if compression is None:
@@ -555,21 +576,23 @@ class TestJson(unittest.TestCase):
         )
         modes_list = ("r", "w", "x", "a", "?")
 
-        for (
-            data_expected,
-            add_file_extension,
-            compression,
-            infer,
-            mode,
-        ) in itertools.product(
-            data_expected_list,
-            add_file_extension_list,
-            compression_list,
-            infer_list,
-            modes_list,
-        ):
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+        with TemporaryDirectory() as tmpdir:
+            for index, (
+                data_expected,
+                add_file_extension,
+                compression,
+                infer,
+                mode,
+            ) in enumerate(
+                itertools.product(
+                    data_expected_list,
+                    add_file_extension_list,
+                    compression_list,
+                    infer_list,
+                    modes_list,
+                )
+            ):
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 if not mode.startswith("r"):
                     self.assertRaises(
@@ -801,21 +824,23 @@ class TestJson(unittest.TestCase):
         infer_list = [True, False]
         modes_list = ["r", "w", "x", "a", "?"]
 
-        for (
-            data_expected,
-            add_file_extension,
-            compression,
-            infer,
-            mode,
-        ) in itertools.product(
-            data_expected_list,
-            add_file_extension_list,
-            compression_list,
-            infer_list,
-            modes_list,
-        ):
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+        with TemporaryDirectory() as tmpdir:
+            for index, (
+                data_expected,
+                add_file_extension,
+                compression,
+                infer,
+                mode,
+            ) in enumerate(
+                itertools.product(
+                    data_expected_list,
+                    add_file_extension_list,
+                    compression_list,
+                    infer_list,
+                    modes_list,
+                )
+            ):
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 if add_file_extension:
                     if compression is None:
@@ -993,21 +1018,23 @@ class TestJson(unittest.TestCase):
         infer_list = [True, False]
         modes_list = ["r", "w", "x", "a", "?"]
 
-        for (
-            data_expected,
-            add_file_extension,
-            compression,
-            infer,
-            mode,
-        ) in itertools.product(
-            data_expected_list,
-            add_file_extension_list,
-            compression_list,
-            infer_list,
-            modes_list,
-        ):
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+        with TemporaryDirectory() as tmpdir:
+            for index, (
+                data_expected,
+                add_file_extension,
+                compression,
+                infer,
+                mode,
+            ) in enumerate(
+                itertools.product(
+                    data_expected_list,
+                    add_file_extension_list,
+                    compression_list,
+                    infer_list,
+                    modes_list,
+                )
+            ):
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 if add_file_extension:
                     if compression is None:
@@ -1204,3 +1231,291 @@ class TestJson(unittest.TestCase):
                         f"Expected: '{data_expected}'\n"
                         f"Observed: '{data_observed}'",
                     )
+
+    def test_read_json_non_standard(self):
+        """test_read_json_non_standard"""
+
+        # Values accepted by json, but not necessarily by faster parsers
+        data_expected_list = [
+            [float("inf"), float("-inf")],
+            {"A": 2**64},
+        ]
+
+        for data_expected in data_expected_list:
+            with TemporaryDirectory() as tmpdir:
+                filepath = Path(tmpdir) / "file.jsonl.gz"
+
+                with gzip.open(filepath, mode="wt") as handle:
+                    handle.write(json.dumps(data_expected) + "\n")
+                self.assertEqual(data_expected, read_json(filepath))
+
+                with gzip.open(filepath, mode="wt") as handle:
+                    handle.write(json.dumps(data_expected) + "\n")
+                    handle.write(json.dumps(data_expected) + "\n")
+                self.assertEqual([data_expected] * 2, read_jsonl(filepath))
+                self.assertEqual(
+                    [[data_expected]] * 2, list(read_jsonl(filepath, chunksize=1))
+                )
+
+    def test_write_json_non_standard(self):
+        """test_write_json_non_standard"""
+
+        # Values accepted by json, but not necessarily by faster serializers
+        data_expected_list = [
+            {"A": 2**64},
+            {1: "a"},
+            "Unicode: \u00e4\u00f6\u00fc \u2713",
+        ]
+
+        for data_expected in data_expected_list:
+            with TemporaryDirectory() as tmpdir:
+                filepath = Path(tmpdir) / "file.jsonl"
+
+                write_json(filepath, data_expected)
+                with open(filepath, mode="r") as handle:
+                    data_observed = json.load(handle)
+                self.assertEqual(json.loads(json.dumps(data_expected)), data_observed)
+
+                write_jsonl(filepath, [data_expected, data_expected])
+                with open(filepath, mode="r") as handle:
+                    data_observed = [json.loads(line) for line in handle]
+                self.assertEqual(
+                    [json.loads(json.dumps(data_expected))] * 2, data_observed
+                )
+
+    def test_write_json_utf8(self):
+        """test_write_json_utf8"""
+
+        # Written as compact UTF-8, independent of the locale and JSON backend
+        data_expected = {"A": "\u00e4", "B": [1, 2]}
+        content_expected = '{"A":"\u00e4","B":[1,2]}\n'.encode("utf-8")
+
+        with TemporaryDirectory() as tmpdir:
+            filepath = Path(tmpdir) / "file.json"
+            write_json(filepath, data_expected)
+            self.assertEqual(content_expected, filepath.read_bytes())
+
+            filepath = Path(tmpdir) / "file.jsonl"
+            write_jsonl(filepath, [data_expected] * 2)
+            self.assertEqual(content_expected * 2, filepath.read_bytes())
+
+    def test_read_write_json_non_finite(self):
+        """test_read_write_json_non_finite"""
+
+        # Faster serializers write non-finite floats as null, unlike json
+        data_expected_list = [
+            [float("inf"), 1.5, None],
+            {"A": float("-inf"), "B": [None, {"C": float("inf")}]},
+        ]
+
+        with TemporaryDirectory() as tmpdir:
+            for data_expected in data_expected_list:
+                filepath = Path(tmpdir) / "file.json"
+                write_json(filepath, data_expected)
+                self.assertEqual(data_expected, read_json(filepath))
+
+                filepath = Path(tmpdir) / "file.jsonl"
+                write_jsonl(filepath, [data_expected, data_expected])
+                self.assertEqual([data_expected] * 2, read_jsonl(filepath))
+
+            filepath = Path(tmpdir) / "file.jsonl"
+            write_jsonl(filepath, [{"A": float("nan")}])
+            self.assertTrue(math.isnan(read_jsonl(filepath)[0]["A"]))
+
+    def test_dumps_non_finite(self):
+        """test_dumps_non_finite"""
+
+        # Faster serializers write non-finite floats as null, unlike json
+        data_expected_list = [
+            [float("inf"), 1.5, None],
+            {"A": float("-inf"), "B": [None, {"C": float("inf")}]},
+            {"A": None, "B": "null"},
+        ]
+
+        for data_expected in data_expected_list:
+            self.assertEqual(data_expected, _loads(_dumps(data_expected)))
+
+        self.assertTrue(math.isnan(_loads(_dumps([float("nan")]))[0]))
+
+    def test_read_json_binary_mode(self):
+        """test_read_json_binary_mode"""
+
+        data_expected = [{"A": "a", "B": 1}, {"A": "\u00e4", "B": 2}]
+
+        with TemporaryDirectory() as tmpdir:
+            for compression in (None, "gzip"):
+                suffix = ".gz" if compression else ""
+                filepath = Path(tmpdir) / ("file.json" + suffix)
+                write_json(filepath, data_expected)
+                self.assertEqual(data_expected, read_json(filepath, mode="rb"))
+
+                filepath = Path(tmpdir) / ("file.jsonl" + suffix)
+                write_jsonl(filepath, data_expected)
+                self.assertEqual(data_expected, read_jsonl(filepath, mode="rb"))
+                self.assertEqual(
+                    [[data] for data in data_expected],
+                    list(read_jsonl(filepath, mode="rb", chunksize=1)),
+                )
+
+    def test_read_json_cache(self):
+        """test_read_json_cache"""
+
+        with TemporaryDirectory() as tmpdir:
+            filepath = Path(tmpdir) / "file.json"
+
+            write_json(filepath, {"A": 1})
+            data_observed = read_json(filepath, cache=True)
+            self.assertEqual({"A": 1}, data_observed)
+
+            # Unchanged file returns the cached object
+            self.assertIs(data_observed, read_json(filepath, cache=True))
+
+            # Modified file is read again
+            write_json(filepath, {"A": 10})
+            self.assertEqual({"A": 10}, read_json(filepath, cache=True))
+
+            # Missing file raises the usual error
+            self.assertRaises(
+                FileNotFoundError, read_json, Path(tmpdir) / "missing", cache=True
+            )
+
+    def test_read_json_large(self):
+        """test_read_json_large"""
+
+        # Files of 1 MiB or more are memory-mapped
+        data_expected = [{"A": "a" * 100, "B": i, "C": 0.1} for i in range(1 << 14)]
+
+        for compression in (None, "infer"):
+            with TemporaryDirectory() as tmpdir:
+                filepath = Path(tmpdir) / "file.json"
+                write_json(filepath, data_expected)
+
+                self.assertEqual(
+                    data_expected, read_json(filepath, compression=compression)
+                )
+
+    def test_read_jsonl_large(self):
+        """test_read_jsonl_large"""
+
+        # Files of 1 MiB or more are memory-mapped and split as bytes
+        data_expected = [{"A": "ä" * 100, "B": i} for i in range(1 << 14)]
+
+        for newline in ("\n", "\r\n"):
+            with TemporaryDirectory() as tmpdir:
+                filepath = Path(tmpdir) / "file.jsonl"
+                with open(filepath, mode="w", newline=newline) as handle:
+                    for item in data_expected:
+                        handle.write(json.dumps(item) + "\n")
+
+                self.assertEqual(data_expected, read_jsonl(filepath))
+
+    def test_write_jsonl_large(self):
+        """test_write_jsonl_large"""
+
+        # Content larger than the write batch size is written in several batches
+        data_expected = [{"A": "ä" * 100, "B": i} for i in range(1 << 12)]
+
+        for extension in ("jsonl", "jsonl.gz", "jsonl.tar", "jsonl.zip"):
+            with TemporaryDirectory() as tmpdir:
+                filepath = Path(tmpdir) / ("file." + extension)
+                write_jsonl(filepath, data_expected)
+
+                self.assertEqual(data_expected, read_jsonl(filepath))
+
+    def test_read_write_jsonl_empty(self):
+        """test_read_write_jsonl_empty"""
+
+        for extension in ("jsonl", "jsonl.gz", "jsonl.zst"):
+            with TemporaryDirectory() as tmpdir:
+                filepath = Path(tmpdir) / ("file." + extension)
+                write_jsonl(filepath, [])
+
+                self.assertEqual([], read_jsonl(filepath))
+                self.assertEqual([], list(read_jsonl(filepath, chunksize=1)))
+
+    def test_read_jsonl_prefetch(self):
+        """test_read_jsonl_prefetch"""
+
+        data_expected = [{"A": "a" * 100, "B": i} for i in range(1 << 12)]
+
+        for extension in ("jsonl", "jsonl.gz", "jsonl.xz", "jsonl.zst"):
+            with TemporaryDirectory() as tmpdir:
+                filepath = Path(tmpdir) / ("file." + extension)
+                write_jsonl(filepath, data_expected)
+
+                self.assertEqual(data_expected, read_jsonl(filepath, prefetch=True))
+
+                chunks = list(read_jsonl(filepath, chunksize=1000, prefetch=True))
+                self.assertEqual([1000] * 4 + [96], [len(chunk) for chunk in chunks])
+                self.assertEqual(data_expected, [obj for c in chunks for obj in c])
+
+    def test_read_jsonl_prefetch_empty_lines(self):
+        """test_read_jsonl_prefetch_empty_lines"""
+
+        with TemporaryDirectory() as tmpdir:
+            filepath = Path(tmpdir) / "file.jsonl"
+
+            # Empty lines at the end of the file are dropped, like without prefetch
+            for content in ("", "\n\n", '{"A": 1}\n', '{"A": 1}\n[2]\n\n\n'):
+                filepath.write_text(content)
+                self.assertEqual(
+                    read_jsonl(filepath), read_jsonl(filepath, prefetch=True)
+                )
+
+            # Empty lines in between are invalid, like without prefetch
+            filepath.write_text('{"A": 1}\n\n[2]\n')
+            self.assertRaises(ValueError, read_jsonl, filepath)
+            self.assertRaises(ValueError, read_jsonl, filepath, prefetch=True)
+
+    @unittest.skipIf(msgspec is None, "requires msgspec")
+    def test_read_jsonl_schema(self):
+        """test_read_jsonl_schema"""
+
+        class Item(msgspec.Struct):
+            A: str
+            B: int
+
+        data = [{"A": "a", "B": i} for i in range(10)]
+        data_expected = [Item(**item) for item in data]
+
+        with TemporaryDirectory() as tmpdir:
+            filepath = Path(tmpdir) / "file.jsonl.gz"
+            write_jsonl(filepath, data)
+
+            self.assertEqual(data_expected, read_jsonl(filepath, schema=Item))
+            self.assertEqual(
+                data_expected,
+                [
+                    item
+                    for chunk in read_jsonl(filepath, chunksize=3, schema=Item)
+                    for item in chunk
+                ],
+            )
+
+            filepath = Path(tmpdir) / "file.json"
+            write_json(filepath, data)
+            self.assertEqual(data_expected, read_json(filepath, schema=List[Item]))
+
+            # Data not matching the schema raises
+            write_json(filepath, {"A": 1, "B": 1})
+            self.assertRaises(msgspec.ValidationError, read_json, filepath, schema=Item)
+
+    def test_read_jsonl_many(self):
+        """test_read_jsonl_many"""
+
+        data_expected = [[{"A": i, "B": j} for j in range(i)] for i in range(5)]
+
+        with TemporaryDirectory() as tmpdir:
+            filepaths = []
+            for i, data in enumerate(data_expected):
+                filepath = Path(tmpdir) / ("file_%d.jsonl.gz" % i)
+                write_jsonl(filepath, data)
+                filepaths.append(filepath)
+
+            for threads in (False, True):
+                self.assertEqual(
+                    data_expected,
+                    read_jsonl_many(filepaths, workers=2, threads=threads),
+                )
+
+            self.assertRaises(ValueError, read_jsonl_many, filepaths, mode="w")
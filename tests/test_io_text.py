@@ -4,14 +4,18 @@ Test text file I/O
 
 import bz2
 import gzip
+import io
 import itertools
 import lzma
 import tarfile
 import unittest
 import zipfile
+from contextlib import contextmanager
 from io import BytesIO
 from pathlib import Path
+from random import Random
 from tempfile import TemporaryDirectory
+from unittest import mock
 
 import zstandard
 
@@ -46,21 +50,23 @@ class TestText(unittest.TestCase):
             "zstd",
         )
 
-        for (
-            text,
-            add_file_extension,
-            compression,
-            infer,
-        ) in itertools.product(
-            text_list,
-            add_file_extension_list,
-            compression_list,
-            infer_list,
-        ):
-            text_expected = text
+        with TemporaryDirectory() as tmpdir:
+            for index, (
+                text,
+                add_file_extension,
+                compression,
+                infer,
+            ) in enumerate(
+                itertools.product(
+                    text_list,
+                    add_file_extension_list,
+                    compression_list,
+                    infer_list,
+                )
+            ):
+                text_expected = text
 
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 content = text
                 content_binary = content.encode()
@@ -209,21 +215,23 @@ class TestText(unittest.TestCase):
         )
         infer_list = [True, False]
 
-        for (
-            text,
-            add_file_extension,
-            compression,
-            infer,
-        ) in itertools.product(
-            text_list,
-            add_file_extension_list,
-            compression_list,
-            infer_list,
-        ):
-            text_expected = text
+        with TemporaryDirectory() as tmpdir:
+            for index, (
+                text,
+                add_file_extension,
+                compression,
+                infer,
+            ) in enumerate(
+                itertools.product(
+                    text_list,
+                    add_file_extension_list,
+                    compression_list,
+                    infer_list,
+                )
+            ):
+                text_expected = text
 
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 if add_file_extension:
                     if compression is None:
@@ -446,21 +454,23 @@ class TestText(unittest.TestCase):
         )
         infer_list = [True, False]
 
-        for (
-            text,
-            add_file_extension,
-            compression,
-            infer,
-        ) in itertools.product(
-            text_list,
-            add_file_extension_list,
-            compression_list,
-            infer_list,
-        ):
-            text_expected = text
+        with TemporaryDirectory() as tmpdir:
+            for index, (
+                text,
+                add_file_extension,
+                compression,
+                infer,
+            ) in enumerate(
+                itertools.product(
+                    text_list,
+                    add_file_extension_list,
+                    compression_list,
+                    infer_list,
+                )
+            ):
+                text_expected = text
 
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 if add_file_extension:
                     if compression is None:
@@ -648,11 +658,11 @@ class TestText(unittest.TestCase):
             "zstd",
         )
 
-        for add_file_extension, compression, infer in itertools.product(
-            add_file_extension_list, compression_list, infer_list
-        ):
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+        with TemporaryDirectory() as tmpdir:
+            for index, (add_file_extension, compression, infer) in enumerate(
+                itertools.product(add_file_extension_list, compression_list, infer_list)
+            ):
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 # Write to file
                 if compression is None:
@@ -831,11 +841,11 @@ class TestText(unittest.TestCase):
         )
         infer_list = [True, False]
 
-        for add_file_extension, compression, infer in itertools.product(
-            add_file_extension_list, compression_list, infer_list
-        ):
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+        with TemporaryDirectory() as tmpdir:
+            for index, (add_file_extension, compression, infer) in enumerate(
+                itertools.product(add_file_extension_list, compression_list, infer_list)
+            ):
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 if add_file_extension:
                     if compression is None:
@@ -1053,11 +1063,11 @@ class TestText(unittest.TestCase):
         )
         infer_list = [True, False]
 
-        for add_file_extension, compression, infer in itertools.product(
-            add_file_extension_list, compression_list, infer_list
-        ):
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+        with TemporaryDirectory() as tmpdir:
+            for index, (add_file_extension, compression, infer) in enumerate(
+                itertools.product(add_file_extension_list, compression_list, infer_list)
+            ):
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 if add_file_extension:
                     if compression is None:
@@ -1205,3 +1215,168 @@ class TestText(unittest.TestCase):
                     f"Expected: '{lines_appended_expected}'\n"
                     f"Observed: '{lines_appended_observed}'",
                 )
+
+    def test_read_text_large(self):
+        """test_read_text_large"""
+
+        # Files of 1 MiB or more are memory-mapped, newlines must still be translated
+        text = "This is a text\r\nThis is\rmore text\n" * (1 << 15)
+        text_expected = text.replace("\r\n", "\n").replace("\r", "\n")
+
+        for compression in (None, "infer"):
+            with TemporaryDirectory() as tmpdir:
+                filepath = Path(tmpdir) / "file.txt"
+                with open(filepath, mode="w", newline="") as handle:
+                    handle.write(text)
+
+                self.assertEqual(
+                    text_expected, read_text(filepath, compression=compression)
+                )
+
+    def test_read_text_large_encoding(self):
+        """test_read_text_large_encoding"""
+
+        # Memory-mapped files are decoded with the locale encoding, like smaller files
+        text_expected = "\u00e4\u00f6\u00fc\n" * (1 << 19)
+
+        with TemporaryDirectory() as tmpdir:
+            filepath = Path(tmpdir) / "file.txt"
+            with open(filepath, mode="wb") as handle:
+                handle.write(text_expected.encode("latin-1"))
+
+            with mock.patch("locale.getpreferredencoding", return_value="latin-1"):
+                self.assertEqual(text_expected, read_text(filepath))
+
+    def test_write_lines_large(self):
+        """test_write_lines_large"""
+
+        # Lines are written in batches
+        lines = ["line %d" % i for i in range(10000)]
+
+        with TemporaryDirectory() as tmpdir:
+            for filename in ("file.txt", "file.txt.gz", "file.txt.tar.gz"):
+                filepath = Path(tmpdir) / filename
+                for value in (lines, []):
+                    write_lines(filepath, value)
+                    self.assertEqual("\n".join(value) + "\n", read_text(filepath))
+
+    def test_read_lines_stream(self):
+        """test_read_lines_stream"""
+
+        lines = ["line %d" % i for i in range(10000)]
+
+        with TemporaryDirectory() as tmpdir:
+            for filename in ("file.txt", "file.txt.gz", "file.txt.zst"):
+                filepath = Path(tmpdir) / filename
+                write_lines(filepath, lines)
+
+                iterator = read_lines(filepath, stream=True)
+                self.assertNotIsInstance(iterator, list)
+                self.assertEqual(lines, list(iterator))
+
+            # Mode is validated
+            self.assertRaises(
+                ValueError, list, read_lines(filepath, mode="w", stream=True)
+            )
+
+    def test_read_lines_chunksize_large(self):
+        """test_read_lines_chunksize_large"""
+
+        # Multi-byte characters span the boundaries of the blocks being decoded
+        lines = ["äöü %d €" % i for i in range(100000)]
+
+        with TemporaryDirectory() as tmpdir:
+            for filename in ("file.txt", "file.txt.gz"):
+                filepath = Path(tmpdir) / filename
+                write_lines(filepath, lines)
+
+                for chunksize in (1, 7, 1 << 20):
+                    chunks = list(read_lines(filepath, chunksize=chunksize))
+                    self.assertTrue(all(len(c) == chunksize for c in chunks[:-1]))
+                    self.assertEqual(lines, [line for c in chunks for line in c])
+                self.assertEqual(lines, list(read_lines(filepath, stream=True)))
+
+    def test_write_text_bytes(self):
+        """test_write_text_bytes"""
+
+        text = "This is a text\nwith ä\n"
+
+        with TemporaryDirectory() as tmpdir:
+            for filename in ("file.txt", "file.txt.gz", "file.txt.tar", "file.txt.zip"):
+                filepath = Path(tmpdir) / filename
+                write_text(filepath, text.encode())
+                self.assertEqual(text, read_text(filepath))
+
+                # Append mode
+                if filename == "file.txt":
+                    write_text(filepath, text.encode(), mode="a")
+                    self.assertEqual(text * 2, read_text(filepath))
+
+    def test_write_text_bytes_encoding(self):
+        """test_write_text_bytes_encoding"""
+
+        text = "This is a text\nwith \u00e4\n"
+
+        # Bytes and str are written with the same encoding
+        with TemporaryDirectory() as tmpdir:
+            filepath_str = Path(tmpdir) / "str.txt"
+            filepath_bytes = Path(tmpdir) / "bytes.txt"
+            write_text(filepath_str, text)
+            write_text(filepath_bytes, text.encode())
+            self.assertEqual(filepath_str.read_bytes(), filepath_bytes.read_bytes())
+
+        # Under a non-UTF-8 locale, bytes are transcoded to the locale encoding
+        contents = []
+
+        @contextmanager
+        def open_file_latin_1(*args, **kwargs):
+            file_handle = io.TextIOWrapper(BytesIO(), encoding="latin-1")
+            yield None, file_handle, False
+            file_handle.flush()
+            contents.append(file_handle.buffer.getvalue())
+
+        with mock.patch("rwkit.io_text.open_file", open_file_latin_1):
+            write_text("file.txt", text.encode())
+        self.assertEqual([text.encode("latin-1")], contents)
+
+    def test_read_lines_prefetch(self):
+        """test_read_lines_prefetch"""
+
+        lines = ["line %d" % i for i in range(100000)]
+
+        with TemporaryDirectory() as tmpdir:
+            for filename in ("file.txt", "file.txt.gz"):
+                filepath = Path(tmpdir) / filename
+                write_lines(filepath, lines)
+
+                chunks = list(read_lines(filepath, chunksize=1000, prefetch=True))
+                self.assertEqual(lines, [line for c in chunks for line in c])
+                self.assertEqual(
+                    lines, list(read_lines(filepath, stream=True, prefetch=True))
+                )
+
+    def test_read_lines_interleaved_zstd(self):
+        """test_read_lines_interleaved_zstd"""
+
+        # Incompressible lines, so that each file is decompressed in several reads
+        random = Random(0)
+        lines_a = ["%032x" % random.getrandbits(128) for _ in range(100000)]
+        lines_b = ["%032x" % random.getrandbits(128) for _ in range(100000)]
+
+        with TemporaryDirectory() as tmpdir:
+            filepath_a = Path(tmpdir) / "a.txt.zst"
+            filepath_b = Path(tmpdir) / "b.txt.zst"
+            write_lines(filepath_a, lines_a)
+            write_lines(filepath_b, lines_b)
+
+            for prefetch in (False, True):
+                observed_a, observed_b = [], []
+                for chunk_a, chunk_b in zip(
+                    read_lines(filepath_a, chunksize=1000, prefetch=prefetch),
+                    read_lines(filepath_b, chunksize=1000, prefetch=prefetch),
+                ):
+                    observed_a.extend(chunk_a)
+                    observed_b.extend(chunk_b)
+
+                self.assertEqual(lines_a, observed_a)
+                self.assertEqual(lines_b, observed_b)
@@ -3,9 +3,12 @@ Test YAML file I/O
 """
 
 import bz2
+import datetime
 import gzip
 import itertools
 import lzma
+import os
+import pickle
 import tarfile
 import unittest
 import zipfile
@@ -45,11 +48,11 @@ class TestYaml(unittest.TestCase):
             "zstd",
         )
 
-        for add_file_extension, compression, infer in itertools.product(
-            add_file_extension_list, compression_list, infer_list
-        ):
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+        with TemporaryDirectory() as tmpdir:
+            for index, (add_file_extension, compression, infer) in enumerate(
+                itertools.product(add_file_extension_list, compression_list, infer_list)
+            ):
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 # Write to file
                 if compression is None:
@@ -173,11 +176,11 @@ class TestYaml(unittest.TestCase):
         )
         infer_list = [True, False]
 
-        for add_file_extension, compression, infer in itertools.product(
-            add_file_extension_list, compression_list, infer_list
-        ):
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+        with TemporaryDirectory() as tmpdir:
+            for index, (add_file_extension, compression, infer) in enumerate(
+                itertools.product(add_file_extension_list, compression_list, infer_list)
+            ):
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 if add_file_extension:
                     if compression is None:
@@ -322,11 +325,11 @@ class TestYaml(unittest.TestCase):
         )
         infer_list = [True, False]
 
-        for add_file_extension, compression, infer in itertools.product(
-            add_file_extension_list, compression_list, infer_list
-        ):
-            with TemporaryDirectory() as tmpdir:
-                filepath = Path(tmpdir) / "file"
+        with TemporaryDirectory() as tmpdir:
+            for index, (add_file_extension, compression, infer) in enumerate(
+                itertools.product(add_file_extension_list, compression_list, infer_list)
+            ):
+                filepath = Path(tmpdir) / ("file_%d" % index)
 
                 if add_file_extension:
                     if compression is None:
@@ -424,3 +427,84 @@ class TestYaml(unittest.TestCase):
                     f"Expected: '{data_expected}'\n"
                     f"Observed: '{data_observed}'",
                 )
+
+    def test_read_yaml_cache_sidecar(self):
+        """test_read_yaml_cache_sidecar"""
+
+        data_expected = {"A": [1, 2, 3], "B": {"C": "text"}}
+
+        with TemporaryDirectory() as tmpdir:
+            for extension in ("yaml", "yaml.gz"):
+                filepath = Path(tmpdir) / ("file." + extension)
+                sidecar = Path(str(filepath) + ".cache.pickle")
+                write_yaml(filepath, data_expected)
+
+                # First read creates the sidecar, second read loads it
+                for _ in range(2):
+                    self.assertEqual(
+                        data_expected, read_yaml(filepath, cache_sidecar=True)
+                    )
+                    self.assertTrue(sidecar.exists())
+
+                # Sidecar is ignored once the file has changed
+                write_yaml(filepath, {"D": "longer than before"})
+                self.assertEqual(
+                    {"D": "longer than before"}, read_yaml(filepath, cache_sidecar=True)
+                )
+
+                # Corrupt sidecar is ignored and replaced
+                sidecar.write_bytes(sidecar.read_bytes()[:20])
+                self.assertEqual(
+                    {"D": "longer than before"}, read_yaml(filepath, cache_sidecar=True)
+                )
+
+            # Missing file raises the usual error
+            self.assertRaises(
+                FileNotFoundError,
+                read_yaml,
+                Path(tmpdir) / "missing.yaml",
+                cache_sidecar=True,
+            )
+
+    def test_read_yaml_cache_sidecar_untrusted(self):
+        """test_read_yaml_cache_sidecar_untrusted"""
+
+        # Types constructed by the safe loader are cached
+        data_expected = {
+            "A": datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+            "B": datetime.date(2024, 1, 2),
+            "C": {1, 2},
+            "D": b"binary",
+        }
+
+        with TemporaryDirectory() as tmpdir:
+            filepath = Path(tmpdir) / "file.yaml"
+            sidecar = Path(str(filepath) + ".cache.pickle")
+            with open(filepath, mode="w") as handle:
+                handle.write(
+                    "A: 2024-01-02 03:04:05+00:00\n"
+                    "B: 2024-01-02\n"
+                    "C: !!set {1, 2}\n"
+                    "D: !!binary YmluYXJ5\n"
+                )
+
+            for _ in range(2):
+                self.assertEqual(data_expected, read_yaml(filepath, cache_sidecar=True))
+            header = sidecar.read_bytes()[:16]
+
+            # Sidecar with other classes is not loaded
+            sidecar.write_bytes(header + pickle.dumps(Path("forbidden")))
+            self.assertEqual(data_expected, read_yaml(filepath, cache_sidecar=True))
+
+            # Sidecar writable by others is not loaded
+            if hasattr(os, "getuid"):
+                sidecar.write_bytes(header + pickle.dumps({"E": "untrusted"}))
+                sidecar.chmod(0o666)
+                self.assertEqual(data_expected, read_yaml(filepath, cache_sidecar=True))
+
+                # Same sidecar is loaded once only writable by its owner
+                sidecar.write_bytes(header + pickle.dumps({"E": "untrusted"}))
+                sidecar.chmod(0o644)
+                self.assertEqual(
+                    {"E": "untrusted"}, read_yaml(filepath, cache_sidecar=True)
+                )